@@ -0,0 +1,32 @@
+"""add keyset pagination indexes
+
+Revision ID: 5c1e2f7a9b3d
+Revises: 8fe75173216a
+Create Date: 2026-10-17 09:12:41.208113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1e2f7a9b3d'
+down_revision: Union[str, None] = '8fe75173216a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_products_name_id', 'products', ['name', 'id'], unique=False)
+    op.create_index('ix_orders_created_at_id', 'orders', ['created_at', 'id'], unique=False)
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+    op.create_index('ix_audit_logs_timestamp_id', 'audit_logs', ['timestamp', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_audit_logs_timestamp_id', table_name='audit_logs')
+    op.drop_index('ix_users_created_at_id', table_name='users')
+    op.drop_index('ix_orders_created_at_id', table_name='orders')
+    op.drop_index('ix_products_name_id', table_name='products')
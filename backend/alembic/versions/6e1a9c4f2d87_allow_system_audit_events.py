@@ -0,0 +1,28 @@
+"""allow system audit events
+
+Revision ID: 6e1a9c4f2d87
+Revises: 3d8c1f6a0b52
+Create Date: 2026-10-18 09:12:44.530917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e1a9c4f2d87'
+down_revision: Union[str, None] = '3d8c1f6a0b52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # System events have no acting user; applies to every partition
+    op.alter_column('audit_logs', 'user_id', existing_type=sa.Integer(), nullable=True)
+
+
+def downgrade() -> None:
+    # Fails while system events exist; they are audit records and are not deleted here
+    op.alter_column('audit_logs', 'user_id', existing_type=sa.Integer(), nullable=False)
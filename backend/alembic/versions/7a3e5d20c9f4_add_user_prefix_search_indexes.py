@@ -0,0 +1,30 @@
+"""add user prefix search indexes
+
+Revision ID: 7a3e5d20c9f4
+Revises: e6d09a3c7f15
+Create Date: 2026-10-17 17:20:05.662418
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a3e5d20c9f4'
+down_revision: Union[str, None] = 'e6d09a3c7f15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE INDEX ix_users_email_prefix ON users (lower(email) text_pattern_ops)")
+    op.execute("CREATE INDEX ix_users_username_prefix ON users (lower(username) text_pattern_ops)")
+    op.execute("CREATE INDEX ix_users_full_name_prefix ON users (lower(full_name) text_pattern_ops)")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_full_name_prefix', table_name='users')
+    op.drop_index('ix_users_username_prefix', table_name='users')
+    op.drop_index('ix_users_email_prefix', table_name='users')
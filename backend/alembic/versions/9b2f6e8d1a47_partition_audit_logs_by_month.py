@@ -0,0 +1,112 @@
+"""partition audit logs by month
+
+Revision ID: 9b2f6e8d1a47
+Revises: 7a3e5d20c9f4
+Create Date: 2026-10-17 17:58:41.305127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b2f6e8d1a47'
+down_revision: Union[str, None] = '7a3e5d20c9f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Free the schema-wide index names before recreating the table
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_unpartitioned")
+    op.execute("ALTER TABLE audit_logs_unpartitioned DROP CONSTRAINT IF EXISTS audit_logs_pkey")
+    op.execute("DROP INDEX IF EXISTS ix_audit_logs_timestamp_id")
+    op.execute("DROP INDEX IF EXISTS ix_audit_logs_id")
+
+    op.execute("""
+        CREATE TABLE audit_logs (
+            id BIGINT NOT NULL DEFAULT nextval('audit_logs_id_seq'),
+            action VARCHAR NOT NULL,
+            entity_type VARCHAR NOT NULL,
+            entity_id INTEGER,
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            user_name VARCHAR NOT NULL,
+            ip_address VARCHAR,
+            user_agent VARCHAR,
+            changes JSONB,
+            timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp)
+    """)
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id")
+    op.execute("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT")
+
+    # One partition per month from the oldest row through three months ahead
+    op.execute("""
+        DO $$
+        DECLARE
+            month_start timestamp;
+        BEGIN
+            month_start := date_trunc('month', coalesce(
+                (SELECT min(timestamp) FROM audit_logs_unpartitioned), now()
+            ) AT TIME ZONE 'UTC');
+            WHILE month_start <= date_trunc('month', now() AT TIME ZONE 'UTC') + interval '3 months' LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF audit_logs FOR VALUES FROM (%L) TO (%L)',
+                    'audit_logs_' || to_char(month_start, '"y"YYYY"m"MM'),
+                    month_start::text || '+00',
+                    (month_start + interval '1 month')::text || '+00'
+                );
+                month_start := month_start + interval '1 month';
+            END LOOP;
+        END $$
+    """)
+
+    op.execute("""
+        INSERT INTO audit_logs (id, action, entity_type, entity_id, user_id, user_name, ip_address, user_agent, changes, timestamp)
+        SELECT id, action, entity_type, entity_id, user_id, user_name, ip_address, user_agent, changes::jsonb, coalesce(timestamp, now())
+        FROM audit_logs_unpartitioned
+    """)
+    op.drop_table('audit_logs_unpartitioned')
+
+    op.create_index('ix_audit_logs_id', 'audit_logs', ['id'], unique=False)
+    op.create_index('ix_audit_logs_timestamp_id', 'audit_logs', ['timestamp', 'id'], unique=False)
+    op.create_index('ix_audit_logs_entity_type_entity_id', 'audit_logs', ['entity_type', 'entity_id'], unique=False)
+    op.create_index('ix_audit_logs_user_id_timestamp', 'audit_logs', ['user_id', 'timestamp'], unique=False)
+    op.create_index('ix_audit_logs_changes', 'audit_logs', ['changes'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_partitioned")
+    op.execute("ALTER TABLE audit_logs_partitioned DROP CONSTRAINT audit_logs_pkey")
+    op.drop_index('ix_audit_logs_changes', table_name='audit_logs_partitioned')
+    op.drop_index('ix_audit_logs_user_id_timestamp', table_name='audit_logs_partitioned')
+    op.drop_index('ix_audit_logs_entity_type_entity_id', table_name='audit_logs_partitioned')
+    op.drop_index('ix_audit_logs_timestamp_id', table_name='audit_logs_partitioned')
+    op.drop_index('ix_audit_logs_id', table_name='audit_logs_partitioned')
+
+    op.create_table('audit_logs',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('audit_logs_id_seq')"), nullable=False),
+    sa.Column('action', sa.String(), nullable=False),
+    sa.Column('entity_type', sa.String(), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('user_name', sa.String(), nullable=False),
+    sa.Column('ip_address', sa.String(), nullable=True),
+    sa.Column('user_agent', sa.String(), nullable=True),
+    sa.Column('changes', sa.JSON(), nullable=True),
+    sa.Column('timestamp', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id")
+    op.execute("""
+        INSERT INTO audit_logs (id, action, entity_type, entity_id, user_id, user_name, ip_address, user_agent, changes, timestamp)
+        SELECT id, action, entity_type, entity_id, user_id, user_name, ip_address, user_agent, changes::json, timestamp
+        FROM audit_logs_partitioned
+    """)
+    op.execute("DROP TABLE audit_logs_partitioned CASCADE")
+    op.create_index('ix_audit_logs_id', 'audit_logs', ['id'], unique=False)
+    op.create_index('ix_audit_logs_timestamp_id', 'audit_logs', ['timestamp', 'id'], unique=False)
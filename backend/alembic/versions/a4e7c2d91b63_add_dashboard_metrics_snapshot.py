@@ -0,0 +1,39 @@
+"""add dashboard metrics snapshot
+
+Revision ID: a4e7c2d91b63
+Revises: e91f3b6d2c84
+Create Date: 2026-10-17 15:21:47.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4e7c2d91b63'
+down_revision: Union[str, None] = 'e91f3b6d2c84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('dashboard_metrics',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('total_products', sa.Integer(), nullable=False),
+    sa.Column('low_stock_products', sa.Integer(), nullable=False),
+    sa.Column('total_categories', sa.Integer(), nullable=False),
+    sa.Column('total_users', sa.Integer(), nullable=False),
+    sa.Column('active_users', sa.Integer(), nullable=False),
+    sa.Column('admin_users', sa.Integer(), nullable=False),
+    sa.Column('total_orders', sa.Integer(), nullable=False),
+    sa.Column('pending_orders', sa.Integer(), nullable=False),
+    sa.Column('total_revenue', sa.DECIMAL(precision=14, scale=2), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('dashboard_metrics')
@@ -0,0 +1,26 @@
+"""add catalog version sequence
+
+Revision ID: d2a8c5f13e47
+Revises: b7d4e9a2c610
+Create Date: 2026-10-17 11:26:05.774310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a8c5f13e47'
+down_revision: Union[str, None] = 'b7d4e9a2c610'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence('catalog_version_seq')))
+
+
+def downgrade() -> None:
+    op.execute(sa.schema.DropSequence(sa.Sequence('catalog_version_seq')))
@@ -0,0 +1,33 @@
+"""add import job upsert mode
+
+Revision ID: e6d09a3c7f15
+Revises: c58b1f04e7a2
+Create Date: 2026-10-17 16:48:29.207316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6d09a3c7f15'
+down_revision: Union[str, None] = 'c58b1f04e7a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    importmode = sa.Enum('INSERT', 'UPSERT', name='importmode')
+    importmode.create(op.get_bind(), checkfirst=True)
+    op.add_column('import_jobs', sa.Column('mode', importmode, server_default='INSERT', nullable=False))
+    op.add_column('import_jobs', sa.Column('updated_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('import_jobs', sa.Column('unchanged_count', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('import_jobs', 'unchanged_count')
+    op.drop_column('import_jobs', 'updated_count')
+    op.drop_column('import_jobs', 'mode')
+    sa.Enum(name='importmode').drop(op.get_bind(), checkfirst=True)
@@ -1,122 +1,87 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Response
+from sqlalchemy import select, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-import csv
-import io
 import json
 from datetime import datetime
-from ...core.database import get_db
-from ...core.deps import get_admin_user
+from ...core.database import get_async_db, get_async_read_db
+from ...core.deps import get_admin_user_async
+from ...core.principals import Principal, notify_principal_change_async
+from ...core.audit import audit_writer
+from ...core.dashboard_metrics import get_dashboard_metrics
+from ...core.pagination import keyset_paginate, next_cursor, set_next_cursor, escape_like, estimated_row_count, set_total_count
+from ...core.import_jobs import submit_import_job, import_job_progress
 from ...models.user import User, UserRole
-from ...models.product import Product, Category
+from ...models.import_job import ImportJob, ImportMode
 from ...schemas.product import ProductCreate, ProductResponse
 from ...schemas.user import UserCreate, UserUpdate
-from ...core.security import get_password_hash
+from ...core.password_hashing import password_hasher
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
 @router.get("/dashboard")
-async def get_admin_dashboard(current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
-    """Get admin dashboard statistics"""
-    total_products = db.query(Product).count()
-    total_categories = db.query(Category).count()
-    total_users = db.query(User).count()
-    active_users = db.query(User).filter(User.is_active == True).count()
-    admin_users = db.query(User).filter(User.role == UserRole.ADMIN).count()
-    low_stock_products = db.query(Product).filter(Product.stock_quantity < 10).count()
+async def get_admin_dashboard(current_user: Principal = Depends(get_admin_user_async), db: AsyncSession = Depends(get_async_read_db)):
+    """Get admin dashboard statistics from the background-refreshed snapshot"""
+    metrics = await get_dashboard_metrics(db)
     
     return {
-        "total_products": total_products,
-        "total_categories": total_categories,
-        "total_users": total_users,
-        "active_users": active_users,
-        "admin_users": admin_users,
-        "low_stock_products": low_stock_products,
+        "total_products": metrics["total_products"],
+        "total_categories": metrics["total_categories"],
+        "total_users": metrics["total_users"],
+        "active_users": metrics["active_users"],
+        "admin_users": metrics["admin_users"],
+        "low_stock_products": metrics["low_stock_products"],
+        "total_orders": metrics["total_orders"],
+        "pending_orders": metrics["pending_orders"],
+        "total_revenue": float(metrics["total_revenue"]),
+        "metrics_refreshed_at": metrics["refreshed_at"].isoformat() if metrics["refreshed_at"] else None,
         "message": f"Welcome back, {current_user.full_name}!"
     }
 
-@router.post("/products/bulk-upload")
+@router.post("/products/bulk-upload", status_code=status.HTTP_202_ACCEPTED)
 async def bulk_upload_products(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    mode: ImportMode = Query(ImportMode.INSERT),
+    current_user: Principal = Depends(get_admin_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Bulk upload products via CSV file"""
+    """Queue a bulk product upload from a CSV file; poll /admin/jobs/{job_id} for progress
+
+    mode=upsert updates products whose SKU already exists and skips unchanged rows.
+    """
     if not file.filename.endswith('.csv'):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Only CSV files are supported"
         )
     
-    try:
-        # Read CSV content
-        content = await file.read()
-        csv_content = content.decode('utf-8')
-        csv_reader = csv.DictReader(io.StringIO(csv_content))
-        
-        created_products = []
-        errors = []
-        
-        for row_num, row in enumerate(csv_reader, start=2):  # Start at 2 for header
-            try:
-                # Validate required fields
-                required_fields = ['name', 'price', 'sku', 'category_name']
-                for field in required_fields:
-                    if not row.get(field):
-                        errors.append(f"Row {row_num}: Missing required field '{field}'")
-                        continue
-                
-                # Find or create category
-                category_name = row['category_name'].strip()
-                category = db.query(Category).filter(Category.name == category_name).first()
-                if not category:
-                    category = Category(name=category_name, description=f"Auto-created category: {category_name}")
-                    db.add(category)
-                    db.commit()
-                    db.refresh(category)
-                
-                # Check if product with SKU already exists
-                existing_product = db.query(Product).filter(Product.sku == row['sku']).first()
-                if existing_product:
-                    errors.append(f"Row {row_num}: Product with SKU '{row['sku']}' already exists")
-                    continue
-                
-                # Create product
-                product = Product(
-                    name=row['name'].strip(),
-                    description=row.get('description', '').strip(),
-                    price=float(row['price']),
-                    sku=row['sku'].strip(),
-                    stock_quantity=int(row.get('stock_quantity', 0)),
-                    category_id=category.id,
-                    manufacturer=row.get('manufacturer', '').strip() or None,
-                    dosage=row.get('dosage', '').strip() or None,
-                    is_prescription_required=row.get('is_prescription_required', '').lower() in ['true', '1', 'yes']
-                )
-                
-                db.add(product)
-                db.commit()
-                db.refresh(product)
-                created_products.append(product.name)
-                
-            except Exception as e:
-                errors.append(f"Row {row_num}: {str(e)}")
-                db.rollback()
-        
-        return {
-            "message": f"Bulk upload completed. Created {len(created_products)} products.",
-            "created_products": created_products,
-            "errors": errors
-        }
-        
-    except Exception as e:
+    job = await submit_import_job(db, file, current_user.id, mode)
+    
+    return {
+        "message": f"Bulk upload queued with {job.total_rows} rows.",
+        "job_id": job.id,
+        "mode": job.mode.value,
+        "status": job.status.value
+    }
+
+@router.get("/jobs/{job_id}")
+async def get_import_job(
+    job_id: str,
+    current_user: Principal = Depends(get_admin_user_async),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get progress of a background import job"""
+    job = await db.get(ImportJob, job_id)
+    if not job:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error processing file: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
         )
+    
+    return import_job_progress(job)
 
 @router.get("/products/export-template")
-async def export_product_template(current_user: User = Depends(get_admin_user)):
+async def export_product_template(current_user: Principal = Depends(get_admin_user_async)):
     """Download CSV template for bulk product upload"""
     template_content = """name,description,price,sku,stock_quantity,category_name,manufacturer,dosage,is_prescription_required
 Aspirin 325mg,Pain reliever and anti-inflammatory,5.99,ASP-325MG,100,Pain Management,Generic Pharma,325mg,false
@@ -129,16 +94,72 @@ Lisinopril 10mg,ACE inhibitor for blood pressure,12.50,LIS-10MG-NEW,50,Heart Hea
             "Optional fields: description, stock_quantity, manufacturer, dosage, is_prescription_required",
             "Categories will be auto-created if they don't exist",
             "SKU must be unique across all products",
+            "Upload with mode=upsert to update existing SKUs; unchanged rows are skipped",
             "Price should be a decimal number (e.g., 12.50)",
             "Stock quantity should be an integer",
             "is_prescription_required should be true/false"
         ]
     }
 
+USER_SORT_COLUMNS = {
+    "created_at": User.created_at,
+    "email": User.email,
+    "username": User.username,
+    "full_name": User.full_name
+}
+
 @router.get("/users")
-async def get_all_users(current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
-    """Get all users for admin management"""
-    users = db.query(User).all()
+async def get_all_users(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    search: Optional[str] = Query(None, max_length=255),
+    role: Optional[UserRole] = None,
+    is_active: Optional[bool] = None,
+    sort: str = "created_at",
+    order: str = "desc",
+    current_user: Principal = Depends(get_admin_user_async),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Search users for admin management
+
+    search matches an email, username or full name prefix, case-insensitively.
+    """
+    sort_column = USER_SORT_COLUMNS.get(sort)
+    if sort_column is None or order not in ("asc", "desc"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid sort; use one of {', '.join(USER_SORT_COLUMNS)} with order asc or desc"
+        )
+    
+    query = select(User)
+    if search and search.strip():
+        # Each branch is served by its lower(column) text_pattern_ops index
+        prefix = escape_like(search.strip().lower()) + "%"
+        query = query.where(or_(
+            func.lower(User.email).like(prefix, escape="\\"),
+            func.lower(User.username).like(prefix, escape="\\"),
+            func.lower(User.full_name).like(prefix, escape="\\")
+        ))
+    if role:
+        query = query.where(User.role == role)
+    if is_active is not None:
+        query = query.where(User.is_active == is_active)
+    
+    if query.whereclause is None:
+        total = await estimated_row_count(db, User.__tablename__)
+        estimated = total is not None
+    else:
+        total, estimated = None, False
+    if total is None:
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
+    set_total_count(response, total, estimated)
+    
+    users = (await db.scalars(keyset_paginate(
+        query, sort_column, User.id, cursor, skip, limit, descending=order == "desc"
+    ))).all()
+    set_next_cursor(response, next_cursor(users, limit, sort))
     return [{
         "id": user.id,
         "email": user.email,
@@ -153,14 +174,14 @@ async def get_all_users(current_user: User = Depends(get_admin_user), db: Sessio
 @router.post("/users")
 async def create_user(
     user_data: UserCreate,
-    current_user: User = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_admin_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new user"""
     # Check if user already exists
-    existing_user = db.query(User).filter(
+    existing_user = await db.scalar(select(User).where(
         (User.email == user_data.email) | (User.username == user_data.username)
-    ).first()
+    ))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -168,7 +189,7 @@ async def create_user(
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await password_hasher.hash(user_data.password)
     new_user = User(
         email=user_data.email,
         username=user_data.username,
@@ -180,18 +201,17 @@ async def create_user(
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     # Log audit
-    log_audit(
+    await log_audit(
         action="CREATE",
         entity_type="USER",
         entity_id=new_user.id,
         user_id=current_user.id,
         user_name=current_user.full_name,
-        changes={"email": new_user.email, "role": new_user.role.value},
-        db=db
+        changes={"email": new_user.email, "role": new_user.role.value}
     )
     
     return {
@@ -209,11 +229,11 @@ async def create_user(
 async def update_user(
     user_id: int,
     user_data: UserUpdate,
-    current_user: User = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_admin_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a user"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -223,10 +243,10 @@ async def update_user(
     # Update fields if provided
     if user_data.email:
         # Check if email is already taken by another user
-        existing_user = db.query(User).filter(
+        existing_user = await db.scalar(select(User).where(
             User.email == user_data.email,
             User.id != user_id
-        ).first()
+        ))
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -236,10 +256,10 @@ async def update_user(
     
     if user_data.username:
         # Check if username is already taken by another user
-        existing_user = db.query(User).filter(
+        existing_user = await db.scalar(select(User).where(
             User.username == user_data.username,
             User.id != user_id
-        ).first()
+        ))
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -264,22 +284,22 @@ async def update_user(
         changes["role"] = {"from": user.role.value, "to": user_data.role}
     
     if user_data.password:
-        user.hashed_password = get_password_hash(user_data.password)
+        user.hashed_password = await password_hasher.hash(user_data.password)
         changes["password"] = "updated"
     
-    db.commit()
-    db.refresh(user)
+    await notify_principal_change_async(db, user.id)
+    await db.commit()
+    await db.refresh(user)
     
     # Log audit if there were changes
     if changes:
-        log_audit(
+        await log_audit(
             action="UPDATE",
             entity_type="USER",
             entity_id=user.id,
             user_id=current_user.id,
             user_name=current_user.full_name,
-            changes=changes,
-            db=db
+            changes=changes
         )
     
     return {
@@ -296,11 +316,11 @@ async def update_user(
 @router.delete("/users/{user_id}")
 async def delete_user(
     user_id: int,
-    current_user: User = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_admin_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a user"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -315,58 +335,73 @@ async def delete_user(
         )
     
     # Log audit before deletion
-    log_audit(
+    await log_audit(
         action="DELETE",
         entity_type="USER",
         entity_id=user.id,
         user_id=current_user.id,
         user_name=current_user.full_name,
-        changes={"deleted_user": user.email},
-        db=db
+        changes={"deleted_user": user.email}
     )
     
-    db.delete(user)
-    db.commit()
+    await db.delete(user)
+    await notify_principal_change_async(db, user_id)
+    await db.commit()
     
     return {"message": "User deleted successfully"}
 
-def log_audit(action: str, entity_type: str, entity_id: int, user_id: int, user_name: str, changes: dict, ip_address: str = None, db: Session = None):
-    """Log audit event to database"""
-    from ...models.audit_log import AuditLog
-    
-    if not db:
-        from ...core.database import SessionLocal
-        db = SessionLocal()
-        should_close = True
-    else:
-        should_close = False
-    
-    try:
-        audit_log = AuditLog(
-            action=action,
-            entity_type=entity_type,
-            entity_id=entity_id,
-            user_id=user_id,
-            user_name=user_name,
-            changes=changes,
-            ip_address=ip_address
-        )
-        
-        db.add(audit_log)
-        db.commit()
-    except Exception as e:
-        print(f"Error logging audit: {e}")
-        db.rollback()
-    finally:
-        if should_close:
-            db.close()
+async def log_audit(action: str, entity_type: str, entity_id: int, user_id: int, user_name: str, changes: dict, ip_address: str = None):
+    """Queue an audit event; the background writer inserts it with the next batch"""
+    await audit_writer.enqueue({
+        "action": action,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "user_id": user_id,
+        "user_name": user_name,
+        "changes": changes,
+        "ip_address": ip_address
+    })
 
 @router.get("/audits")
-async def get_audit_logs(current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
-    """Get audit logs from database"""
+async def get_audit_logs(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    action: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    entity_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_user: Principal = Depends(get_admin_user_async),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """Get audit logs from database
+
+    created_from/created_to bound the timestamp so only the matching monthly
+    partitions are scanned.
+    """
     from ...models.audit_log import AuditLog
     
-    audit_logs = db.query(AuditLog).order_by(AuditLog.timestamp.desc()).limit(100).all()
+    query = select(AuditLog)
+    if action:
+        query = query.where(AuditLog.action == action)
+    if entity_type:
+        query = query.where(AuditLog.entity_type == entity_type)
+    if entity_id is not None:
+        query = query.where(AuditLog.entity_id == entity_id)
+    if user_id is not None:
+        query = query.where(AuditLog.user_id == user_id)
+    if created_from:
+        query = query.where(AuditLog.timestamp >= created_from)
+    if created_to:
+        query = query.where(AuditLog.timestamp < created_to)
+    
+    audit_logs = (await db.scalars(keyset_paginate(
+        query, AuditLog.timestamp, AuditLog.id, cursor, skip, limit, descending=True
+    ))).all()
+    set_next_cursor(response, next_cursor(audit_logs, limit, "timestamp"))
     
     return [{
         "id": log.id,
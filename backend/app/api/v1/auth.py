@@ -1,40 +1,49 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request, BackgroundTasks
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta, timezone
 import secrets
-from ...core.database import get_db
-from ...core.security import verify_password, get_password_hash, create_access_token
+from typing import Optional
+from ...core.config import settings
+from ...core.database import get_db, get_async_db
+from ...core.rate_limit import client_ip, rate_limiter
+from ...core.revocation import revocation_filter
+from ...core.security import needs_rehash, verify_token
+from ...core.password_hashing import password_hasher, rehash_password
+from ...core.principals import notify_principal_change_async
+from ...core.refresh_tokens import issue_token_pair, rotate_refresh_token, revoke_refresh_token, revoke_user_refresh_tokens
 from ...models.user import User
 from ...schemas.user import UserCreate, UserLogin, UserResponse, Token
-from ...schemas.auth import ResendVerificationRequest, ForgotPasswordRequest, ResetPasswordRequest
+from ...schemas.auth import ResendVerificationRequest, ForgotPasswordRequest, ResetPasswordRequest, RefreshTokenRequest
 from ...core.email import send_verification_email, send_password_reset_email
 
-# Simple rate limiting storage (use Redis in production)
-login_attempts = {}
-
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+optional_bearer = HTTPBearer(auto_error=False)
+
 @router.post("/register")
-def register(
+async def register(
     user_data: UserCreate,
     background_tasks: BackgroundTasks, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Check if user exists
-    if db.query(User).filter(User.email == user_data.email).first():
+    if await db.scalar(select(User.id).where(User.email == user_data.email)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    if db.query(User).filter(User.username == user_data.username).first():
+    if await db.scalar(select(User.id).where(User.username == user_data.username)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already taken"
         )
     
-    # Create user
-    hashed_password = get_password_hash(user_data.password)
+    # Create user; hashing runs on the password process pool
+    hashed_password = await password_hasher.hash(user_data.password)
     
     # Generate verification token
     token = secrets.token_urlsafe(32)
@@ -53,8 +62,7 @@ def register(
     )
     
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
     
     # Send verification email
     background_tasks.add_task(send_verification_email, user.email, token)    
@@ -135,11 +143,11 @@ def forgot_password(
 
 
 @router.post("/reset-password")
-def reset_password(
+async def reset_password(
     request: ResetPasswordRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user = db.query(User).filter(User.password_reset_token == request.token).first()
+    user = await db.scalar(select(User).where(User.password_reset_token == request.token))
 
     if not user or user.password_reset_expires < datetime.now(timezone.utc):
         raise HTTPException(
@@ -147,40 +155,41 @@ def reset_password(
             detail="Invalid or expired token."
         )
 
-    user.hashed_password = get_password_hash(request.password)
+    user.hashed_password = await password_hasher.hash(request.password)
     user.password_reset_token = None
     user.password_reset_expires = None
-    db.commit()
+    await notify_principal_change_async(db, user.id)
+    # Sign out every session; outstanding access tokens lapse on their own
+    await revoke_user_refresh_tokens(db, user.id)
+    await db.commit()
 
     return {"message": "Password has been reset successfully."}
 
 
 @router.post("/login")
-def login(request: Request, credentials: UserLogin, db: Session = Depends(get_db)):
-    client_ip = request.client.host
-    
-    # Rate limiting check
-    now = datetime.now(timezone.utc)
-    if client_ip in login_attempts:
-        attempts = login_attempts[client_ip]
-        # Remove attempts older than 15 minutes
-        attempts = [attempt for attempt in attempts if now - attempt < timedelta(minutes=15)]
-        login_attempts[client_ip] = attempts
-        
-        if len(attempts) >= 5:
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Too many login attempts. Please try again later."
-            )
-    
-    user = db.query(User).filter(User.email == credentials.email).first()
-    
-    if not user or not verify_password(credentials.password, user.hashed_password):
-        # Record failed attempt
-        if client_ip not in login_attempts:
-            login_attempts[client_ip] = []
-        login_attempts[client_ip].append(now)
-        
+async def login(
+    request: Request,
+    credentials: UserLogin,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Without a trustworthy client IP every login would share one key (the proxy's)
+    client = client_ip(request.scope)
+    rate_limit_key = f"login:{client}" if client else f"login:email:{credentials.email.lower()}"
+    
+    # Recorded up front so concurrent guesses cannot overshoot the limit;
+    # a successful login takes back only its own attempt
+    limit = await rate_limiter.hit(rate_limit_key, settings.LOGIN_RATE_LIMIT, settings.LOGIN_RATE_WINDOW_SECONDS)
+    if not limit.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts. Please try again later.",
+            headers=limit.headers
+        )
+    
+    user = await db.scalar(select(User).where(User.email == credentials.email))
+    
+    if not user or not await password_hasher.verify(credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
@@ -198,15 +207,17 @@ def login(request: Request, credentials: UserLogin, db: Session = Depends(get_db
             detail="Email not verified. Please check your email."
         )
     
-    # Clear failed attempts on successful login
-    if client_ip in login_attempts:
-        del login_attempts[client_ip]
+    # Only failed attempts count; never clear the others on the shared key
+    await rate_limiter.refund(rate_limit_key, limit)
+    
+    # Move legacy bcrypt hashes to the current scheme after the response is sent
+    if needs_rehash(user.hashed_password):
+        background_tasks.add_task(rehash_password, user.id, credentials.password, user.hashed_password)
     
-    access_token = create_access_token(data={"sub": str(user.id)})
+    tokens = await issue_token_pair(db, user)
     
     return {
-        "access_token": access_token,
-        "token_type": "bearer",
+        **tokens,
         "user": {
             "id": user.id,
             "email": user.email,
@@ -219,4 +230,29 @@ def login(request: Request, credentials: UserLogin, db: Session = Depends(get_db
             "is_verified": user.is_verified,
             "created_at": user.created_at.isoformat()
         }
-    }
\ No newline at end of file
+    }
+
+
+@router.post("/refresh")
+async def refresh(
+    request: RefreshTokenRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Single use: the presented token is retired and a replay revokes the whole session
+    return await rotate_refresh_token(db, request.refresh_token)
+
+
+@router.post("/logout")
+async def logout(
+    request: Optional[RefreshTokenRequest] = None,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_bearer),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if request:
+        await revoke_refresh_token(db, request.refresh_token)
+    
+    # Also end the current access token now rather than when it expires
+    payload = verify_token(credentials.credentials) if credentials else None
+    if payload and payload.get("jti") and payload.get("exp"):
+        await revocation_filter.revoke(payload["jti"], payload["exp"])
+    return {"message": "Logged out"}
\ No newline at end of file
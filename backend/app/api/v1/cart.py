@@ -1,17 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
+from typing import Optional
 from ...core.database import get_db
 from ...core.deps import get_current_user
+from ...core.principals import Principal
+from ...core.idempotency import (
+    get_idempotency_key, request_fingerprint,
+    begin_idempotent_request, complete_idempotent_request
+)
 from ...models.cart import Cart, CartItem
 from ...models.product import Product
-from ...models.user import User
 from ...schemas.cart import CartResponse, CartItemCreate
 
 router = APIRouter(prefix="/cart", tags=["Cart"])
 
 @router.get("/", response_model=CartResponse)
 def get_cart(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     cart = db.query(Cart).filter(Cart.user_id == current_user.id).first()
@@ -77,9 +82,16 @@ def test_add_to_cart(
 @router.post("/items", response_model=CartResponse)
 def add_to_cart(
     item_data: CartItemCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
+    idempotency_key: Optional[str] = Depends(get_idempotency_key),
     db: Session = Depends(get_db)
 ):
+    replay = begin_idempotent_request(
+        db, current_user.id, idempotency_key, request_fingerprint("add_to_cart", item_data)
+    )
+    if replay:
+        return replay
+    
     # Check if product exists and is active
     product = db.query(Product).filter(
         Product.id == item_data.product_id,
@@ -110,8 +122,7 @@ def add_to_cart(
     if not cart:
         cart = Cart(user_id=current_user.id)
         db.add(cart)
-        db.commit()
-        db.refresh(cart)
+        db.flush()
     
     # Check if item already in cart
     existing_item = db.query(CartItem).filter(
@@ -135,18 +146,29 @@ def add_to_cart(
         )
         db.add(cart_item)
     
-    db.commit()
+    db.flush()
     db.refresh(cart)
+    cart_response = CartResponse.model_validate(cart)
+    complete_idempotent_request(db, current_user.id, idempotency_key, cart_response)
     
-    return cart
+    db.commit()
+    
+    return cart_response
 
 @router.put("/items/{item_id}")
 def update_cart_item(
     item_id: int,
     quantity: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
+    idempotency_key: Optional[str] = Depends(get_idempotency_key),
     db: Session = Depends(get_db)
 ):
+    replay = begin_idempotent_request(
+        db, current_user.id, idempotency_key, request_fingerprint("update_cart_item", [item_id, quantity])
+    )
+    if replay:
+        return replay
+    
     cart_item = db.query(CartItem).join(Cart).filter(
         CartItem.id == item_id,
         Cart.user_id == current_user.id
@@ -163,16 +185,25 @@ def update_cart_item(
     else:
         cart_item.quantity = quantity
     
+    result = {"message": "Cart updated"}
+    complete_idempotent_request(db, current_user.id, idempotency_key, result)
     db.commit()
     
-    return {"message": "Cart updated"}
+    return result
 
 @router.delete("/items/{item_id}")
 def remove_from_cart(
     item_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
+    idempotency_key: Optional[str] = Depends(get_idempotency_key),
     db: Session = Depends(get_db)
 ):
+    replay = begin_idempotent_request(
+        db, current_user.id, idempotency_key, request_fingerprint("remove_from_cart", item_id)
+    )
+    if replay:
+        return replay
+    
     cart_item = db.query(CartItem).join(Cart).filter(
         CartItem.id == item_id,
         Cart.user_id == current_user.id
@@ -185,6 +216,9 @@ def remove_from_cart(
         )
     
     db.delete(cart_item)
+    
+    result = {"message": "Item removed from cart"}
+    complete_idempotent_request(db, current_user.id, idempotency_key, result)
     db.commit()
     
-    return {"message": "Item removed from cart"}
\ No newline at end of file
+    return result
\ No newline at end of file
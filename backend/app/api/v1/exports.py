@@ -0,0 +1,125 @@
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy import select
+from typing import Optional
+from datetime import datetime
+from ...core.database import AsyncSessionLocal, AsyncReplicaSessionLocal
+from ...core.read_your_writes import reads_from_primary
+from ...core.deps import get_admin_user_async
+from ...core.principals import Principal
+from ...core.export import ExportFormat, streaming_export
+from ...models.user import User, UserRole
+from ...models.order import Order, OrderStatus
+from ...models.product import Product, Category
+from ...models.audit_log import AuditLog
+
+router = APIRouter(prefix="/admin/exports", tags=["Admin"])
+
+async def _session_factory(request: Request):
+    return AsyncSessionLocal if await reads_from_primary(request) else AsyncReplicaSessionLocal
+
+def _filter_dates(stmt, column, created_from: Optional[datetime], created_to: Optional[datetime]):
+    if created_from:
+        stmt = stmt.where(column >= created_from)
+    if created_to:
+        stmt = stmt.where(column < created_to)
+    return stmt
+
+@router.get("/products")
+async def export_products(
+    request: Request,
+    format: ExportFormat = Query(ExportFormat.CSV),
+    is_active: Optional[bool] = None,
+    category_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_user: Principal = Depends(get_admin_user_async)
+):
+    """Stream products as CSV or NDJSON"""
+    stmt = select(
+        Product.id, Product.sku, Product.name, Product.description, Product.price,
+        Product.stock_quantity, Category.name.label("category_name"), Product.manufacturer,
+        Product.dosage, Product.is_prescription_required, Product.is_active,
+        Product.created_at, Product.updated_at
+    ).outerjoin(Category, Product.category_id == Category.id)
+
+    if is_active is not None:
+        stmt = stmt.where(Product.is_active == is_active)
+    if category_id:
+        stmt = stmt.where(Product.category_id == category_id)
+    stmt = _filter_dates(stmt, Product.created_at, created_from, created_to)
+
+    return streaming_export(stmt.order_by(Product.id), format, "products", await _session_factory(request))
+
+@router.get("/orders")
+async def export_orders(
+    request: Request,
+    format: ExportFormat = Query(ExportFormat.CSV),
+    status: Optional[OrderStatus] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_user: Principal = Depends(get_admin_user_async)
+):
+    """Stream orders as CSV or NDJSON"""
+    stmt = select(
+        Order.id, Order.user_id, User.email.label("customer_email"), Order.status,
+        Order.total_amount, Order.payment_method, Order.payment_status,
+        Order.shipping_address, Order.created_at, Order.updated_at
+    ).join(User, Order.user_id == User.id)
+
+    if status:
+        stmt = stmt.where(Order.status == status)
+    stmt = _filter_dates(stmt, Order.created_at, created_from, created_to)
+
+    return streaming_export(stmt.order_by(Order.created_at, Order.id), format, "orders", await _session_factory(request))
+
+@router.get("/users")
+async def export_users(
+    request: Request,
+    format: ExportFormat = Query(ExportFormat.CSV),
+    role: Optional[UserRole] = None,
+    is_active: Optional[bool] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_user: Principal = Depends(get_admin_user_async)
+):
+    """Stream users as CSV or NDJSON"""
+    stmt = select(
+        User.id, User.email, User.username, User.full_name, User.role,
+        User.is_active, User.is_verified, User.created_at
+    )
+
+    if role:
+        stmt = stmt.where(User.role == role)
+    if is_active is not None:
+        stmt = stmt.where(User.is_active == is_active)
+    stmt = _filter_dates(stmt, User.created_at, created_from, created_to)
+
+    return streaming_export(stmt.order_by(User.created_at, User.id), format, "users", await _session_factory(request))
+
+@router.get("/audit-logs")
+async def export_audit_logs(
+    request: Request,
+    format: ExportFormat = Query(ExportFormat.CSV),
+    action: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    user_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_user: Principal = Depends(get_admin_user_async)
+):
+    """Stream audit logs as CSV or NDJSON"""
+    stmt = select(
+        AuditLog.id, AuditLog.timestamp, AuditLog.action, AuditLog.entity_type,
+        AuditLog.entity_id, AuditLog.user_id, AuditLog.user_name,
+        AuditLog.ip_address, AuditLog.changes
+    )
+
+    if action:
+        stmt = stmt.where(AuditLog.action == action)
+    if entity_type:
+        stmt = stmt.where(AuditLog.entity_type == entity_type)
+    if user_id:
+        stmt = stmt.where(AuditLog.user_id == user_id)
+    stmt = _filter_dates(stmt, AuditLog.timestamp, created_from, created_to)
+
+    return streaming_export(stmt.order_by(AuditLog.timestamp, AuditLog.id), format, "audit-logs", await _session_factory(request))
@@ -1,13 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import Integer, column, select, update, values
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from collections import defaultdict
 from decimal import Decimal
-from ...core.database import get_db
+from ...core.database import get_db, get_read_db
 from ...core.deps import get_current_user, get_admin_user
+from ...core.principals import Principal
+from ...core.cache import notify_stock_change
+from ...core.idempotency import (
+    get_idempotency_key, request_fingerprint,
+    begin_idempotent_request, complete_idempotent_request
+)
+from ...core.pagination import keyset_paginate, next_cursor, set_next_cursor
 from ...models.order import Order, OrderItem, OrderStatus
 from ...models.cart import Cart, CartItem
 from ...models.product import Product
-from ...models.user import User
 from ...schemas.order import OrderCreate, OrderResponse
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
@@ -15,29 +23,61 @@ router = APIRouter(prefix="/orders", tags=["Orders"])
 @router.post("/", response_model=OrderResponse)
 def create_order(
     order_data: OrderCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
+    idempotency_key: Optional[str] = Depends(get_idempotency_key),
     db: Session = Depends(get_db)
 ):
-    # Calculate total
-    total_amount = Decimal('0')
-    order_items = []
+    # Retries carrying the same Idempotency-Key get the first response back
+    replay = begin_idempotent_request(
+        db, current_user.id, idempotency_key, request_fingerprint("create_order", order_data)
+    )
+    if replay:
+        return replay
     
+    # Total quantity requested per product
+    quantities = defaultdict(int)
     for item in order_data.items:
-        product = db.query(Product).filter(Product.id == item.product_id).first()
+        if item.quantity <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid quantity for product {item.product_id}"
+            )
+        quantities[item.product_id] += item.quantity
+    
+    if not quantities:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Order has no items"
+        )
+    
+    # Lock every involved product in one statement, in id order so concurrent
+    # checkouts always acquire row locks in the same order and cannot deadlock
+    products = db.query(Product).filter(
+        Product.id.in_(quantities.keys())
+    ).order_by(Product.id).with_for_update().all()
+    products_by_id = {p.id: p for p in products}
+    
+    for product_id, quantity in quantities.items():
+        product = products_by_id.get(product_id)
         if not product:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Product {item.product_id} not found"
+                detail=f"Product {product_id} not found"
             )
         
-        if product.stock_quantity < item.quantity:
+        if product.stock_quantity < quantity:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Insufficient stock for {product.name}"
             )
-        
-        item_total = product.price * item.quantity
-        total_amount += item_total
+    
+    # Calculate total
+    total_amount = Decimal('0')
+    order_items = []
+    
+    for item in order_data.items:
+        product = products_by_id[item.product_id]
+        total_amount += product.price * item.quantity
         
         order_items.append(OrderItem(
             product_id=item.product_id,
@@ -45,41 +85,55 @@ def create_order(
             price=product.price
         ))
     
-    # Create order
+    # Decrement stock for all products in one conditional UPDATE
+    requested = values(
+        column("id", Integer), column("quantity", Integer), name="requested"
+    ).data(list(quantities.items()))
+    updated = db.execute(
+        update(Product)
+        .where(Product.id == requested.c.id, Product.stock_quantity >= requested.c.quantity)
+        .values(stock_quantity=Product.stock_quantity - requested.c.quantity)
+        .returning(Product.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    
+    if len(updated) != len(quantities):
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Stock changed during checkout, please try again"
+        )
+    
+    # Create order with its items
     order = Order(
         user_id=current_user.id,
         total_amount=total_amount,
         shipping_address=order_data.shipping_address,
-        payment_method=order_data.payment_method
+        payment_method=order_data.payment_method,
+        items=order_items
     )
-    
     db.add(order)
-    db.commit()
-    db.refresh(order)
-    
-    # Add order items
-    for order_item in order_items:
-        order_item.order_id = order.id
-        db.add(order_item)
-        
-        # Update stock
-        product = db.query(Product).filter(Product.id == order_item.product_id).first()
-        product.stock_quantity -= order_item.quantity
     
     # Clear cart
-    cart = db.query(Cart).filter(Cart.user_id == current_user.id).first()
-    if cart:
-        db.query(CartItem).filter(CartItem.cart_id == cart.id).delete()
+    db.query(CartItem).filter(
+        CartItem.cart_id.in_(select(Cart.id).where(Cart.user_id == current_user.id))
+    ).delete(synchronize_session=False)
     
-    db.commit()
+    notify_stock_change(db, list(quantities.keys()))
+    
+    db.flush()
     db.refresh(order)
+    order_response = OrderResponse.model_validate(order)
+    complete_idempotent_request(db, current_user.id, idempotency_key, order_response)
     
-    return order
+    db.commit()
+    
+    return order_response
 
 @router.get("/", response_model=List[OrderResponse])
 def get_user_orders(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
     orders = db.query(Order).filter(Order.user_id == current_user.id).all()
     return orders
@@ -87,8 +141,8 @@ def get_user_orders(
 @router.get("/{order_id}", response_model=OrderResponse)
 def get_order(
     order_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
     order = db.query(Order).filter(
         Order.id == order_id,
@@ -106,17 +160,24 @@ def get_order(
 # Admin routes
 @router.get("/admin/all", response_model=List[OrderResponse])
 def get_all_orders(
-    admin: User = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    admin: Principal = Depends(get_admin_user),
+    db: Session = Depends(get_read_db)
 ):
-    orders = db.query(Order).all()
+    orders = keyset_paginate(
+        db.query(Order), Order.created_at, Order.id, cursor, skip, limit, descending=True
+    ).all()
+    set_next_cursor(response, next_cursor(orders, limit, "created_at"))
     return orders
 
 @router.put("/{order_id}/status")
 def update_order_status(
     order_id: int,
     status: OrderStatus,
-    admin: User = Depends(get_admin_user),
+    admin: Principal = Depends(get_admin_user),
     db: Session = Depends(get_db)
 ):
     order = db.query(Order).filter(Order.id == order_id).first()
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from ...core.database import get_db
+from collections import defaultdict
+from ...core.database import get_db, get_read_db
 from ...core.deps import get_admin_user
+from ...core.principals import Principal
+from ...core.cache import catalog_cache, notify_catalog_change
+from ...core.http_cache import get_catalog_version, catalog_etag, not_modified, set_cache_headers
+from ...core.pagination import keyset_paginate, next_cursor, set_next_cursor
+from ...core.search import search_products
 from ...models.product import Product, Category
-from ...models.user import User
 from ...models.product_image import ProductImage
 from ...schemas.product import ProductCreate, ProductResponse, CategoryCreate, CategoryResponse
 
@@ -13,30 +18,73 @@ router = APIRouter(prefix="/products", tags=["Products"])
 # Public routes
 @router.get("/")
 def get_products(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = None,
     category_id: Optional[int] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
+):
+    # Entries are keyed by catalog version, which is only adopted once the
+    # replica has had time to apply the change it describes
+    version = get_catalog_version()
+    cache_key = ("products", version, skip, limit, cursor, category_id, search)
+    cached = catalog_cache.get(cache_key)
+    if cached is None:
+        result, cursor_out = _load_products(db, skip, limit, cursor, category_id, search)
+        # Checkouts do not bump the catalog version, so the ETag also covers
+        # the stock on the page and changes when the entry is rebuilt
+        etag = catalog_etag(version, "products", repr(cache_key[2:]) + _stock_variant(result))
+        cached = (result, cursor_out, etag)
+        catalog_cache.set(cache_key, cached)
+    
+    result, cursor_out, etag = cached
+    cached_response = not_modified(request, etag, "products")
+    if cached_response:
+        return cached_response
+    set_cache_headers(response, etag, "products")
+    set_next_cursor(response, cursor_out)
+    return result
+
+def _stock_variant(products: List[dict]) -> str:
+    return "|".join(f"{p['id']}:{p['stock_quantity']}" for p in products)
+
+def _load_products(
+    db: Session,
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    category_id: Optional[int],
+    search: Optional[str]
 ):
     query = db.query(Product)
     
     if category_id:
         query = query.filter(Product.category_id == category_id)
     
+    cursor_out = None
     if search:
-        query = query.filter(Product.name.ilike(f"%{search}%"))
+        # Relevance-ranked results page by offset only
+        products = search_products(query, search).offset(skip).limit(limit).all()
+    else:
+        products = keyset_paginate(query, Product.name, Product.id, cursor, skip, limit).all()
+        cursor_out = next_cursor(products, limit, "name")
     
-    products = query.offset(skip).limit(limit).all()
+    # Load images for the whole page in one query and group them by product
+    images_by_product = defaultdict(list)
+    if products:
+        images = db.query(ProductImage).filter(
+            ProductImage.product_id.in_([p.id for p in products])
+        ).order_by(ProductImage.product_id, ProductImage.display_order).all()
+        for img in images:
+            images_by_product[img.product_id].append(img)
     
     # Enhanced response format with stock status and images
     result = []
     for p in products:
-        # Get product images
-        from ...models.product_image import ProductImage
-        images = db.query(ProductImage).filter(
-            ProductImage.product_id == p.id
-        ).order_by(ProductImage.display_order).all()
+        images = images_by_product[p.id]
         
         product_data = {
             "id": p.id,
@@ -61,10 +109,28 @@ def get_products(
         }
         result.append(product_data)
     
-    return result
+    return result, cursor_out
 
 @router.get("/{product_id}")
-def get_product(product_id: int, db: Session = Depends(get_db)):
+def get_product(product_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    version = get_catalog_version()
+    cached = catalog_cache.get(("product", product_id, version))
+    if cached is None:
+        product_data = _load_product(db, product_id)
+        # A checkout drops this entry on every worker without a new catalog
+        # version, so the ETag also covers the stock
+        etag = catalog_etag(version, "product", f"{product_id}:{product_data['stock_quantity']}")
+        cached = (product_data, etag)
+        catalog_cache.set(("product", product_id, version), cached)
+    
+    product_data, etag = cached
+    cached_response = not_modified(request, etag, "product")
+    if cached_response:
+        return cached_response
+    set_cache_headers(response, etag, "product")
+    return product_data
+
+def _load_product(db: Session, product_id: int) -> dict:
     product = db.query(Product).filter(
         Product.id == product_id,
         Product.is_active == True
@@ -81,7 +147,7 @@ def get_product(product_id: int, db: Session = Depends(get_db)):
         ProductImage.product_id == product.id
     ).order_by(ProductImage.display_order).all()
     
-    return {
+    product_data = {
         "id": product.id,
         "name": product.name,
         "description": product.description,
@@ -102,22 +168,38 @@ def get_product(product_id: int, db: Session = Depends(get_db)):
             "is_primary": img.is_primary
         } for img in images]
     }
+    
+    return product_data
 
 @router.get("/categories/")
-def get_categories(db: Session = Depends(get_db)):
+def get_categories(request: Request, response: Response, db: Session = Depends(get_read_db)):
+    version = get_catalog_version()
+    etag = catalog_etag(version, "categories")
+    cached_response = not_modified(request, etag, "categories")
+    if cached_response:
+        return cached_response
+    set_cache_headers(response, etag, "categories")
+    
+    cached = catalog_cache.get(("categories", version))
+    if cached is not None:
+        return cached
+    
     categories = db.query(Category).all()
-    return [{
+    result = [{
         "id": c.id,
         "name": c.name,
         "description": c.description
     } for c in categories]
+    
+    catalog_cache.set(("categories", version), result)
+    return result
 
 # Admin routes
 @router.post("/", response_model=ProductResponse)
 def create_product(
     product_data: ProductCreate,
     db: Session = Depends(get_db),
-    admin: User = Depends(get_admin_user)
+    admin: Principal = Depends(get_admin_user)
 ):
     # Check if SKU exists
     if db.query(Product).filter(Product.sku == product_data.sku).first():
@@ -128,6 +210,8 @@ def create_product(
     
     product = Product(**product_data.dict())
     db.add(product)
+    db.flush()
+    notify_catalog_change(db, "product", product.id)
     db.commit()
     db.refresh(product)
     
@@ -138,7 +222,7 @@ def update_product(
     product_id: int,
     product_data: ProductCreate,
     db: Session = Depends(get_db),
-    admin: User = Depends(get_admin_user)
+    admin: Principal = Depends(get_admin_user)
 ):
     product = db.query(Product).filter(Product.id == product_id).first()
     
@@ -151,6 +235,7 @@ def update_product(
     for field, value in product_data.dict().items():
         setattr(product, field, value)
     
+    notify_catalog_change(db, "product", product.id)
     db.commit()
     db.refresh(product)
     
@@ -160,7 +245,7 @@ def update_product(
 def delete_product(
     product_id: int,
     db: Session = Depends(get_db),
-    admin: User = Depends(get_admin_user)
+    admin: Principal = Depends(get_admin_user)
 ):
     product = db.query(Product).filter(Product.id == product_id).first()
     
@@ -171,6 +256,7 @@ def delete_product(
         )
     
     db.delete(product)
+    notify_catalog_change(db, "product", product_id)
     db.commit()
     
     return {"message": "Product deleted successfully"}
@@ -179,10 +265,11 @@ def delete_product(
 def create_category(
     category_data: CategoryCreate,
     db: Session = Depends(get_db),
-    admin: User = Depends(get_admin_user)
+    admin: Principal = Depends(get_admin_user)
 ):
     category = Category(**category_data.dict())
     db.add(category)
+    notify_catalog_change(db, "category")
     db.commit()
     db.refresh(category)
     
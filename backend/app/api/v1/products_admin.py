@@ -1,13 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import os
 import uuid
 import shutil
 from pathlib import Path
-from ...core.database import get_db
-from ...core.deps import get_admin_user
-from ...models.user import User
+from ...core.database import get_async_db
+from ...core.deps import get_admin_user_async
+from ...core.principals import Principal
+from ...core.cache import notify_catalog_change_async
 from ...models.product import Product, Category, ProductCreate
 from ...models.product_image import ProductImage
 
@@ -16,13 +18,13 @@ router = APIRouter(prefix="/admin/products", tags=["Admin Products"])
 @router.post("/", status_code=status.HTTP_201_CREATED)
 async def create_product(
     product_in: ProductCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_admin_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_admin_user_async)
 ):
     """Create a new product"""
     
     # Check if SKU is unique
-    existing_sku = db.query(Product).filter(Product.sku == product_in.sku).first()
+    existing_sku = await db.scalar(select(Product).where(Product.sku == product_in.sku))
     if existing_sku:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -30,7 +32,7 @@ async def create_product(
         )
 
     # Check if category exists
-    category = db.query(Category).filter(Category.id == product_in.category_id).first()
+    category = await db.get(Category, product_in.category_id)
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -40,8 +42,10 @@ async def create_product(
     new_product = Product(**product_in.dict())
     
     db.add(new_product)
-    db.commit()
-    db.refresh(new_product)
+    await db.flush()
+    await notify_catalog_change_async(db, "product", new_product.id)
+    await db.commit()
+    await db.refresh(new_product)
     
     return {
         "id": new_product.id,
@@ -68,12 +72,12 @@ async def update_product(
     manufacturer: str = Form(""),
     dosage: str = Form(""),
     is_prescription_required: bool = Form(False),
-    current_user: User = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_admin_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update product details"""
     
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.get(Product, product_id)
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -81,10 +85,10 @@ async def update_product(
         )
     
     # Check if SKU is unique (excluding current product)
-    existing_sku = db.query(Product).filter(
+    existing_sku = await db.scalar(select(Product).where(
         Product.sku == sku,
         Product.id != product_id
-    ).first()
+    ))
     if existing_sku:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -102,8 +106,9 @@ async def update_product(
     product.dosage = dosage
     product.is_prescription_required = is_prescription_required
     
-    db.commit()
-    db.refresh(product)
+    await notify_catalog_change_async(db, "product", product.id)
+    await db.commit()
+    await db.refresh(product)
     
     return {
         "id": product.id,
@@ -122,13 +127,13 @@ async def update_product(
 async def upload_product_images(
     product_id: int,
     files: List[UploadFile] = File(...),
-    current_user: User = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_admin_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload images for a product"""
     
     # Check if product exists
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.get(Product, product_id)
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -183,8 +188,9 @@ async def upload_product_images(
             )
             
             db.add(product_image)
-            db.commit()
-            db.refresh(product_image)
+            await notify_catalog_change_async(db, "product", product_id)
+            await db.commit()
+            await db.refresh(product_image)
             
             uploaded_images.append({
                 "id": product_image.id,
@@ -211,15 +217,15 @@ async def upload_product_images(
 async def delete_product_image(
     product_id: int,
     image_id: int,
-    current_user: User = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_admin_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a product image"""
     
-    image = db.query(ProductImage).filter(
+    image = await db.scalar(select(ProductImage).where(
         ProductImage.id == image_id,
         ProductImage.product_id == product_id
-    ).first()
+    ))
     
     if not image:
         raise HTTPException(
@@ -233,21 +239,22 @@ async def delete_product_image(
         file_path.unlink()
     
     # Delete from database
-    db.delete(image)
-    db.commit()
+    await db.delete(image)
+    await notify_catalog_change_async(db, "product", product_id)
+    await db.commit()
     
     return {"message": "Image deleted successfully"}
 
 @router.get("/{product_id}/images")
 async def get_product_images(
     product_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all images for a product"""
     
-    images = db.query(ProductImage).filter(
+    images = (await db.scalars(select(ProductImage).where(
         ProductImage.product_id == product_id
-    ).order_by(ProductImage.display_order).all()
+    ).order_by(ProductImage.display_order))).all()
     
     return [{
         "id": img.id,
@@ -1,5 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 import os
 import uuid
@@ -9,9 +11,10 @@ try:
     from PIL import Image
 except ImportError:
     Image = None
-from ...core.database import get_db
-from ...core.deps import get_admin_user
-from ...models.user import User
+from ...core.database import get_async_db
+from ...core.deps import get_admin_user_async
+from ...core.principals import Principal
+from ...core.cache import notify_catalog_change_async
 from ...models.product import Product
 from ...models.product_image import ProductImage
 
@@ -61,13 +64,13 @@ async def upload_product_images(
     product_id: int,
     files: List[UploadFile] = File(...),
     alt_texts: Optional[List[str]] = Form(None),
-    current_user: User = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_admin_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload multiple images for a product (max 3)"""
     
     # Check if product exists
-    product = db.query(Product).filter(Product.id == product_id).first()
+    product = await db.get(Product, product_id)
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -82,7 +85,9 @@ async def upload_product_images(
         )
     
     # Check current image count
-    current_images = db.query(ProductImage).filter(ProductImage.product_id == product_id).count()
+    current_images = await db.scalar(
+        select(func.count()).select_from(ProductImage).where(ProductImage.product_id == product_id)
+    )
     if current_images + len(files) > 3:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -107,10 +112,10 @@ async def upload_product_images(
         try:
             # Save file
             with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
+                await run_in_threadpool(shutil.copyfileobj, file.file, buffer)
             
-            # Resize and optimize image
-            resize_image(file_path)
+            # Resize and optimize image off the event loop
+            await run_in_threadpool(resize_image, file_path)
             
             # Create database record
             alt_text = alt_texts[i] if alt_texts and i < len(alt_texts) else f"{product.name} - Image {i+1}"
@@ -125,8 +130,9 @@ async def upload_product_images(
             )
             
             db.add(product_image)
-            db.commit()
-            db.refresh(product_image)
+            await notify_catalog_change_async(db, "product", product_id)
+            await db.commit()
+            await db.refresh(product_image)
             
             uploaded_images.append({
                 "id": product_image.id,
@@ -153,12 +159,12 @@ async def upload_product_images(
 @router.delete("/product-images/{image_id}")
 async def delete_product_image(
     image_id: int,
-    current_user: User = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_admin_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a product image"""
     
-    image = db.query(ProductImage).filter(ProductImage.id == image_id).first()
+    image = await db.get(ProductImage, image_id)
     if not image:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -171,21 +177,22 @@ async def delete_product_image(
         file_path.unlink()
     
     # Delete from database
-    db.delete(image)
-    db.commit()
+    await db.delete(image)
+    await notify_catalog_change_async(db, "product", image.product_id)
+    await db.commit()
     
     return {"message": "Image deleted successfully"}
 
 @router.get("/product-images/{product_id}")
 async def get_product_images(
     product_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get all images for a product"""
     
-    images = db.query(ProductImage).filter(
+    images = (await db.scalars(select(ProductImage).where(
         ProductImage.product_id == product_id
-    ).order_by(ProductImage.display_order).all()
+    ).order_by(ProductImage.display_order))).all()
     
     return [{
         "id": img.id,
@@ -1,17 +1,184 @@
-from sqlalchemy.orm import Session
+"""
+Audit logging - events are queued in-process and written in batches by a background flusher
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import List, Optional
 from fastapi import Request
-from typing import Optional
-import json
-from ..models.audit_log import AuditLog, AuditAction
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from .config import settings
+from .database import engine, async_engine
+from ..models.audit_log import AuditLog
 from ..models.user import User
 
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+# Every queued event carries exactly these keys, so a batch is one executemany
+# rather than one statement per distinct key set
+EVENT_COLUMNS = ("action", "entity_type", "entity_id", "user_id", "user_name", "changes", "ip_address", "user_agent", "timestamp")
+
+def _normalize(event: dict) -> dict:
+    normalized = {column: event.get(column) for column in EVENT_COLUMNS}
+    if normalized["timestamp"] is None:
+        normalized["timestamp"] = datetime.now(timezone.utc)
+    return normalized
+
+class AuditWriter:
+    """Bounded audit queue flushed with multi-row INSERTs every N events or T ms
+
+    Producers wait while the queue is full (backpressure); if it stays full
+    past AUDIT_ENQUEUE_TIMEOUT_SECONDS the event is written inline instead of
+    being dropped. Pending events are flushed on shutdown. Only events the
+    database rejects are lost; each is logged at ERROR and counted in stats().
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping = False
+        self.dropped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done() and not self._stopping
+
+    def start(self):
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=settings.AUDIT_QUEUE_MAX_SIZE)
+        self._stopping = False
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self):
+        if not self.running:
+            return
+        self._stopping = True
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "max_size": settings.AUDIT_QUEUE_MAX_SIZE,
+            "running": self.running,
+            "dropped": self.dropped
+        }
+
+    async def enqueue(self, event: dict):
+        """Queue an event from async code"""
+        event = _normalize(event)
+        if not self.running:
+            await self._write([event])
+            return
+        try:
+            await asyncio.wait_for(self._queue.put(event), settings.AUDIT_ENQUEUE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning("Audit queue full; writing event inline")
+            await self._write([event])
+
+    def submit(self, event: dict):
+        """Queue an event from sync code, blocking while the queue is full"""
+        event = _normalize(event)
+        if not self.running:
+            self._write_sync([event])
+            return
+
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+
+        if on_loop:
+            # Cannot block the loop waiting for space
+            try:
+                self._queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._write_sync([event])
+        else:
+            asyncio.run_coroutine_threadsafe(self.enqueue(event), self._loop).result()
+
+    async def _next_batch(self):
+        batch: List[dict] = []
+        first = await self._queue.get()
+        if first is _STOP:
+            return batch, True
+        batch.append(first)
+
+        deadline = self._loop.time() + settings.AUDIT_FLUSH_INTERVAL_MS / 1000
+        while len(batch) < settings.AUDIT_FLUSH_BATCH_SIZE:
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                event = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if event is _STOP:
+                return batch, True
+            batch.append(event)
+        return batch, False
+
+    async def _run(self):
+        while True:
+            batch, stop = await self._next_batch()
+            if batch:
+                await self._write(batch)
+            if stop:
+                break
+
+        # Producers that were blocked on a full queue when shutdown began
+        remaining = []
+        while not self._queue.empty():
+            event = self._queue.get_nowait()
+            if event is not _STOP:
+                remaining.append(event)
+        if remaining:
+            await self._write(remaining)
+
+    async def _write(self, events: List[dict]):
+        try:
+            async with async_engine.begin() as conn:
+                await conn.execute(insert(AuditLog), events)
+            return
+        except Exception as e:
+            if len(events) == 1:
+                self._drop(events, e)
+                return
+            logger.warning(f"Audit batch insert failed, retrying row by row: {e}")
+
+        # Isolate the bad rows so one event cannot sink the whole batch
+        for event in events:
+            await self._write([event])
+
+    def _write_sync(self, events: List[dict]):
+        try:
+            with engine.begin() as conn:
+                conn.execute(insert(AuditLog), events)
+        except Exception as e:
+            self._drop(events, e)
+
+    def _drop(self, events: List[dict], error: Exception):
+        self.dropped += len(events)
+        for event in events:
+            logger.error(f"Dropped audit event {event.get('action')} {event.get('entity_type')} by {event.get('user_name')}: {error}")
+
+audit_writer = AuditWriter()
+
 class AuditLogger:
-    def __init__(self, db: Session):
+    def __init__(self, db: Optional[Session] = None):
+        # Kept for existing callers; events no longer share the request transaction
         self.db = db
-    
+
     def log(
         self,
-        action: AuditAction,
+        action: str,
         resource_type: str,
         description: str,
         user: Optional[User] = None,
@@ -19,44 +186,43 @@ class AuditLogger:
         details: Optional[dict] = None,
         request: Optional[Request] = None
     ):
-        """Log an audit event"""
-        
+        """Queue an audit event"""
+
         # Get IP and user agent from request
         ip_address = None
         user_agent = None
-        
+
         if request:
             ip_address = request.client.host if request.client else None
             user_agent = request.headers.get("user-agent")
-        
-        # Create audit log entry
-        audit_log = AuditLog(
-            user_id=user.id if user else None,
-            action=action,
-            resource_type=resource_type,
-            resource_id=str(resource_id) if resource_id else None,
-            description=description,
-            details=json.dumps(details) if details else None,
-            ip_address=ip_address,
-            user_agent=user_agent
-        )
-        
-        self.db.add(audit_log)
-        self.db.commit()
-        return audit_log
+
+        changes = {"description": description}
+        if details:
+            changes["details"] = details
+
+        audit_writer.submit({
+            "action": getattr(action, "value", action),
+            "entity_type": resource_type.upper(),
+            "entity_id": int(resource_id) if resource_id is not None and str(resource_id).isdigit() else None,
+            "user_id": user.id if user else None,
+            "user_name": user.full_name if user else "system",
+            "changes": changes,
+            "ip_address": ip_address,
+            "user_agent": user_agent
+        })
 
 # Helper functions for common audit events
-def log_user_action(db: Session, user: User, action: AuditAction, description: str, request: Request = None, details: dict = None):
+def log_user_action(db: Session, user: User, action: str, description: str, request: Request = None, details: dict = None):
     """Log user-related actions"""
     logger = AuditLogger(db)
     return logger.log(action, "user", description, user, user.id, details, request)
 
-def log_admin_action(db: Session, admin: User, action: AuditAction, resource_type: str, resource_id: str, description: str, request: Request = None, details: dict = None):
+def log_admin_action(db: Session, admin: User, action: str, resource_type: str, resource_id: str, description: str, request: Request = None, details: dict = None):
     """Log admin actions"""
     logger = AuditLogger(db)
     return logger.log(action, resource_type, f"Admin {admin.email}: {description}", admin, resource_id, details, request)
 
-def log_system_action(db: Session, action: AuditAction, resource_type: str, description: str, details: dict = None):
+def log_system_action(db: Session, action: str, resource_type: str, description: str, details: dict = None):
     """Log system actions"""
     logger = AuditLogger(db)
-    return logger.log(action, resource_type, f"System: {description}", None, None, details, None)
\ No newline at end of file
+    return logger.log(action, resource_type, f"System: {description}", None, None, details, None)
@@ -0,0 +1,150 @@
+"""
+Monthly audit_logs partitions - created ahead of time, dropped once past retention
+"""
+import asyncio
+import logging
+import re
+from datetime import datetime, timezone
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from starlette.concurrency import run_in_threadpool
+from .config import settings
+from .database import engine
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "audit_logs"
+DEFAULT_PARTITION = "audit_logs_default"
+PARTITION_NAME = re.compile(r"^audit_logs_y(\d{4})m(\d{2})$")
+
+# Only one worker maintains partitions at a time
+MAINTENANCE_LOCK_KEY = 0x0A0D17
+
+def _add_months(month_start: datetime, months: int) -> datetime:
+    index = month_start.year * 12 + month_start.month - 1 + months
+    return month_start.replace(year=index // 12, month=index % 12 + 1)
+
+def _month_start(moment: datetime) -> datetime:
+    return moment.astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+def partition_name(month_start: datetime) -> str:
+    return f"{PARENT_TABLE}_y{month_start.year:04d}m{month_start.month:02d}"
+
+def create_audit_partition(conn: Connection, start: datetime, end: datetime, name: str):
+    """Create one monthly partition, moving in any rows that already landed in the default partition
+
+    CREATE TABLE ... PARTITION OF fails once the default partition holds a row
+    in the new range (e.g. a late or clock-skewed event), so the table is
+    created detached, filled from the default partition and then attached.
+    """
+    bounds = {"start": start, "end": end}
+    # Keep new rows for this range out of the default partition until it is attached
+    conn.execute(text(f"LOCK TABLE {DEFAULT_PARTITION} IN ACCESS EXCLUSIVE MODE"))
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    moved = conn.execute(text(
+        f"WITH moved AS ("
+        f"DELETE FROM {DEFAULT_PARTITION} WHERE timestamp >= :start AND timestamp < :end RETURNING *"
+        f") INSERT INTO {name} SELECT * FROM moved"
+    ), bounds).rowcount
+    if moved:
+        logger.info(f"Moved {moved} audit rows from {DEFAULT_PARTITION} into {name}")
+    conn.execute(text(
+        f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+
+def ensure_audit_partitions(conn: Connection, months_ahead: int) -> List[str]:
+    """Create the default partition and one partition per month through months_ahead
+
+    Each partition is created in its own savepoint, so one failure neither
+    stops the others nor the retention drops in the same pass.
+    """
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+
+    created = []
+    month_start = _month_start(datetime.now(timezone.utc))
+    for offset in range(months_ahead + 1):
+        start = _add_months(month_start, offset)
+        end = _add_months(start, 1)
+        name = partition_name(start)
+        exists = conn.scalar(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+        if exists:
+            continue
+        try:
+            with conn.begin_nested():
+                create_audit_partition(conn, start, end, name)
+        except Exception as e:
+            logger.error(f"Failed to create audit partition {name}: {e}")
+            continue
+        created.append(name)
+    return created
+
+def drop_expired_audit_partitions(conn: Connection, retention_months: int) -> List[str]:
+    """Drop whole monthly partitions older than the retention window instead of DELETEing rows"""
+    cutoff = _add_months(_month_start(datetime.now(timezone.utc)), -retention_months)
+    children = conn.scalars(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:parent)"
+    ), {"parent": PARENT_TABLE}).all()
+
+    dropped = []
+    for name in children:
+        match = PARTITION_NAME.match(name)
+        if not match:
+            continue
+        start = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+        if _add_months(start, 1) > cutoff:
+            continue
+        try:
+            with conn.begin_nested():
+                conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+                conn.execute(text(f"DROP TABLE {name}"))
+        except Exception as e:
+            logger.error(f"Failed to drop audit partition {name}: {e}")
+            continue
+        dropped.append(name)
+    return dropped
+
+def maintain_audit_partitions() -> Optional[dict]:
+    """Run one maintenance pass; returns None when another worker holds the lock"""
+    with engine.begin() as conn:
+        if not conn.scalar(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": MAINTENANCE_LOCK_KEY}):
+            return None
+        created = ensure_audit_partitions(conn, settings.AUDIT_PARTITION_MONTHS_AHEAD)
+        dropped = drop_expired_audit_partitions(conn, settings.AUDIT_RETENTION_MONTHS)
+
+    if created or dropped:
+        logger.info(f"Audit partitions created: {created}, dropped: {dropped}")
+    return {"created": created, "dropped": dropped}
+
+class AuditRetentionJob:
+    """Background task that keeps future partitions ready and drops expired ones"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        while True:
+            try:
+                await run_in_threadpool(maintain_audit_partitions)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Audit partition maintenance failed: {e}")
+            await asyncio.sleep(settings.AUDIT_MAINTENANCE_INTERVAL_HOURS * 3600)
+
+audit_retention_job = AuditRetentionJob()
@@ -8,10 +8,11 @@ from typing import Optional, List, Dict, Any
 from datetime import datetime
 
 from .enhanced_security import (
-    token_manager, rate_limiter, session_manager, 
+    token_manager, session_manager, 
     CSRFProtection, SecurityConfig
 )
 from .deps import get_db
+from .rate_limit import client_ip, rate_limiter
 
 class AuthMiddleware:
     """Authentication middleware for cookie-based JWT"""
@@ -47,17 +48,17 @@ class AuthMiddleware:
             "email": user.email,
             "username": user.username,
             "full_name": user.full_name,
-            "roles": self.get_user_roles(user_id),
+            "roles": [user.role.value] if user.role else ["user"],
             "permissions": payload.get("permissions", []),
             "two_fa_enabled": getattr(user, 'two_fa_enabled', False)
         }
     
     def get_user_roles(self, user_id: int) -> List[str]:
-        """Get user roles from database"""
-        from ..models.user import User
-        user = self.db.query(User).filter(User.id == user_id).first()
-        if user and user.role:
-            return [user.role]
+        """Get user roles from the principal cache"""
+        from .principals import load_principal
+        principal = load_principal(self.db, user_id)
+        if principal and principal.role:
+            return [principal.role.value]
         return ["user"]
     
     def set_auth_cookies(self, response: Response, access_token: str, refresh_token: str):
@@ -114,17 +115,20 @@ def require_admin(current_user: Dict[str, Any] = Depends(require_auth)) -> Dict[
     return current_user
 
 def rate_limit(key_prefix: str, limit: int, window: int):
-    """Rate limiting decorator"""
-    def rate_limit_checker(request: Request):
-        client_ip = request.client.host
-        key = f"{key_prefix}:{client_ip}"
+    """Rate limiting dependency"""
+    async def rate_limit_checker(request: Request):
+        ip = client_ip(request.scope)
+        if ip is None:
+            # Behind an untrusted proxy every client would share one key
+            return True
+        key = f"{key_prefix}:{ip}"
         
-        if rate_limiter.is_rate_limited(key, limit, window):
-            remaining = rate_limiter.get_remaining_attempts(key, limit)
+        result = await rate_limiter.hit(key, limit, window)
+        if not result.allowed:
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                 detail=f"Rate limit exceeded. Try again later.",
-                headers={"Retry-After": str(window)}
+                headers=result.headers
             )
         return True
     return rate_limit_checker
\ No newline at end of file
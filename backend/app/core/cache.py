@@ -0,0 +1,268 @@
+"""
+In-process caches with cross-worker invalidation via Postgres LISTEN/NOTIFY
+"""
+import json
+import logging
+import select
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, Union
+import psycopg2
+import psycopg2.extensions
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from .config import settings
+from .database import engine
+
+logger = logging.getLogger(__name__)
+
+CATALOG_CHANNEL = "catalog_changes"
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after a fixed TTL"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def delete_matching(self, predicate):
+        """Drop every key for which predicate(key) is true"""
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                del self._entries[key]
+
+    def delete_namespace(self, namespace: str):
+        """Drop every key whose first element is the given namespace"""
+        self.delete_matching(lambda key: key[0] == namespace)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+catalog_cache = TTLCache(settings.CATALOG_CACHE_MAX_ENTRIES, settings.CATALOG_CACHE_TTL_SECONDS)
+
+def apply_catalog_change(kind: str, entity_id: Optional[Union[int, List[int]]] = None):
+    """Drop the cache entries affected by a catalog change"""
+    if kind == "product":
+        entity_ids = set(entity_id if isinstance(entity_id, list) else [entity_id])
+        catalog_cache.delete_matching(lambda key: key[0] == "product" and key[1] in entity_ids)
+        catalog_cache.delete_namespace("products")
+    elif kind == "stock":
+        # Listings keep their stock until the entry expires
+        entity_ids = set(entity_id if isinstance(entity_id, list) else [entity_id])
+        catalog_cache.delete_matching(lambda key: key[0] == "product" and key[1] in entity_ids)
+    elif kind == "category":
+        catalog_cache.delete_namespace("categories")
+        catalog_cache.delete_namespace("products")
+    else:
+        catalog_cache.clear()
+
+# nextval() runs in the writer's own transaction and the NOTIFY carrying the
+# version is only delivered on commit, so a version is never announced before
+# its data is visible. A sequence rather than a counter row, so concurrent
+# writers never wait on a row lock.
+NOTIFY_CATALOG_CHANGE = text(
+    "SELECT pg_notify(:channel, jsonb_set(CAST(:payload AS jsonb), '{version}', "
+    "to_jsonb(nextval('catalog_version_seq')))::text)"
+)
+READ_CATALOG_VERSION = text("SELECT last_value FROM catalog_version_seq")
+
+def notify_catalog_change(db: Session, kind: str, entity_id: Optional[Union[int, List[int]]] = None):
+    """Queue a catalog change notification, with a new catalog version, on the current transaction
+
+    NOTIFY is transactional, so other workers only hear about the change once
+    the caller commits. The local cache is dropped straight away.
+    """
+    payload = json.dumps({"kind": kind, "id": entity_id})
+    db.execute(NOTIFY_CATALOG_CHANGE, {"channel": CATALOG_CHANNEL, "payload": payload})
+    apply_catalog_change(kind, entity_id)
+
+async def notify_catalog_change_async(db: AsyncSession, kind: str, entity_id: Optional[Union[int, List[int]]] = None):
+    """AsyncSession variant of notify_catalog_change"""
+    payload = json.dumps({"kind": kind, "id": entity_id})
+    await db.execute(NOTIFY_CATALOG_CHANGE, {"channel": CATALOG_CHANNEL, "payload": payload})
+    apply_catalog_change(kind, entity_id)
+
+def notify_stock_change(db: Session, product_ids: List[int]):
+    """Queue a stock-only change on the current transaction
+
+    Unlike notify_catalog_change this does not take a new catalog version, so
+    checkouts do not invalidate every cached listing and ETag. Only the
+    products' detail entries are dropped; listings show stock up to
+    CATALOG_CACHE_TTL_SECONDS old.
+    """
+    payload = json.dumps({"kind": "stock", "id": product_ids})
+    db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CATALOG_CHANNEL, "payload": payload})
+    apply_catalog_change("stock", product_ids)
+
+def _apply_catalog_payload(payload: str):
+    try:
+        change = json.loads(payload)
+        apply_catalog_change(change.get("kind"), change.get("id"))
+    except ValueError:
+        catalog_cache.clear()
+        return
+    if change.get("version") is not None:
+        catalog_version.announce(int(change["version"]))
+
+def _reset_catalog():
+    catalog_cache.clear()
+    catalog_version.reload()
+
+def read_catalog_version() -> int:
+    """Read the catalog version from the primary"""
+    with engine.connect() as conn:
+        return conn.execute(READ_CATALOG_VERSION).scalar() or 0
+
+class CatalogVersionTracker:
+    """This worker's copy of the catalog version, advanced by NOTIFY so serving an ETag never queries it
+
+    With a separate replica a new version is only adopted READ_YOUR_WRITES_SECONDS
+    after it is announced, so ETags and cache entries under that version are
+    never built from replica data older than it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._pending: List[Tuple[float, int]] = []  # (adopt at, version), oldest first
+
+    @staticmethod
+    def _adopt_delay() -> float:
+        if settings.DATABASE_REPLICA_URL == settings.DATABASE_URL:
+            return 0.0
+        return float(settings.READ_YOUR_WRITES_SECONDS)
+
+    def current(self) -> Optional[int]:
+        """The adopted version, or None until one is known"""
+        with self._lock:
+            now = time.monotonic()
+            while self._pending and self._pending[0][0] <= now:
+                _, version = self._pending.pop(0)
+                self._version = max(self._version or 0, version)
+            return self._version
+
+    def announce(self, version: int):
+        delay = self._adopt_delay()
+        with self._lock:
+            if delay:
+                self._pending.append((time.monotonic() + delay, version))
+            else:
+                self._version = max(self._version or 0, version)
+
+    def reload(self):
+        """Re-read the version after notifications may have been missed
+
+        The value read is adopted at once, and the previous version keeps
+        being served if the read fails, so a reconnect never sends every
+        request to the primary.
+        """
+        try:
+            version = read_catalog_version()
+        except Exception as e:
+            logger.warning(f"Failed to read catalog version: {e}")
+            return
+        with self._lock:
+            self._version = max(self._version or 0, version)
+            self._pending = [(adopt_at, pending) for adopt_at, pending in self._pending if pending > self._version]
+
+catalog_version = CatalogVersionTracker()
+
+class CacheInvalidationListener:
+    """Background thread that LISTENs for cache invalidations from every worker"""
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # channel -> (apply a payload, reset the cache when notifications may have been missed)
+        self._channels: Dict[str, Tuple[Callable[[str], None], Callable[[], None]]] = {
+            CATALOG_CHANNEL: (_apply_catalog_payload, _reset_catalog)
+        }
+        # True only while notifications are being received
+        self.connected = False
+
+    def subscribe(self, channel: str, on_message: Callable[[str], None], on_reset: Callable[[], None]):
+        """Register a channel; must happen before start() so it is LISTENed on connect"""
+        self._channels[channel] = (on_message, on_reset)
+
+    def _reset_all(self):
+        for _, on_reset in self._channels.values():
+            on_reset()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-invalidation-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self.connected = False
+
+    def _run(self):
+        dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        backoff = 1
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(dsn)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                cursor = conn.cursor()
+                for channel in self._channels:
+                    cursor.execute(f"LISTEN {channel}")
+                # Anything could have changed while we were not listening
+                self._reset_all()
+                self.connected = True
+                backoff = 1
+
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notification = conn.notifies.pop(0)
+                        handler = self._channels.get(notification.channel)
+                        if handler:
+                            handler[0](notification.payload)
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener error: {e}")
+                self.connected = False
+                # Without notifications the caches cannot be trusted
+                self._reset_all()
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+invalidation_listener = CacheInvalidationListener()
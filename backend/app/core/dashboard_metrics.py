@@ -0,0 +1,127 @@
+"""
+Admin dashboard metrics - one aggregate query, snapshotted by a background refresher
+"""
+import asyncio
+import logging
+from typing import Optional
+from sqlalchemy import select, func, true, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from .config import settings
+from .database import AsyncSessionLocal
+from ..models.dashboard_metrics import DashboardMetrics
+from ..models.order import Order, OrderStatus
+from ..models.product import Product, Category
+from ..models.user import User, UserRole
+
+logger = logging.getLogger(__name__)
+
+# Only one worker refreshes the snapshot per interval
+REFRESH_LOCK_KEY = 0x0D45B0A2D
+
+METRIC_FIELDS = (
+    "total_products", "low_stock_products", "total_categories",
+    "total_users", "active_users", "admin_users",
+    "total_orders", "pending_orders", "total_revenue",
+)
+
+async def compute_dashboard_metrics(db: AsyncSession) -> dict:
+    """Compute every dashboard counter in a single statement using FILTER clauses"""
+    products = select(
+        func.count().label("total_products"),
+        func.count().filter(Product.stock_quantity < 10).label("low_stock_products")
+    ).subquery()
+    categories = select(
+        func.count().label("total_categories")
+    ).select_from(Category).subquery()
+    users = select(
+        func.count().label("total_users"),
+        func.count().filter(User.is_active == True).label("active_users"),
+        func.count().filter(User.role == UserRole.ADMIN).label("admin_users")
+    ).subquery()
+    orders = select(
+        func.count().label("total_orders"),
+        func.count().filter(Order.status == OrderStatus.PENDING).label("pending_orders"),
+        func.coalesce(func.sum(Order.total_amount).filter(Order.status != OrderStatus.CANCELLED), 0).label("total_revenue")
+    ).subquery()
+    
+    stmt = select(
+        products.c.total_products, products.c.low_stock_products,
+        categories.c.total_categories,
+        users.c.total_users, users.c.active_users, users.c.admin_users,
+        orders.c.total_orders, orders.c.pending_orders, orders.c.total_revenue
+    ).select_from(
+        products.join(categories, true()).join(users, true()).join(orders, true())
+    )
+    row = (await db.execute(stmt)).one()
+    return dict(row._mapping)
+
+async def refresh_dashboard_metrics(db: AsyncSession) -> bool:
+    """Recompute and store the snapshot unless another worker is doing it or already did this interval"""
+    locked = await db.scalar(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": REFRESH_LOCK_KEY})
+    if not locked:
+        await db.rollback()
+        return False
+    
+    # The lock only excludes concurrent refreshes; every worker still takes it in turn
+    fresh = await db.scalar(
+        select(DashboardMetrics.id).where(
+            DashboardMetrics.id == 1,
+            DashboardMetrics.refreshed_at > func.now() - func.make_interval(0, 0, 0, 0, 0, 0, settings.DASHBOARD_METRICS_REFRESH_SECONDS)
+        )
+    )
+    if fresh is not None:
+        await db.rollback()
+        return False
+    
+    values = await compute_dashboard_metrics(db)
+    await db.execute(
+        insert(DashboardMetrics)
+        .values(id=1, refreshed_at=func.now(), **values)
+        .on_conflict_do_update(index_elements=["id"], set_={**values, "refreshed_at": func.now()})
+    )
+    await db.commit()
+    return True
+
+async def get_dashboard_metrics(db: AsyncSession) -> dict:
+    """Read the snapshot, computing it inline only if it has never been stored"""
+    snapshot = await db.get(DashboardMetrics, 1)
+    if snapshot is None:
+        values = await compute_dashboard_metrics(db)
+        values["refreshed_at"] = None
+        return values
+    
+    values = {field: getattr(snapshot, field) for field in METRIC_FIELDS}
+    values["refreshed_at"] = snapshot.refreshed_at
+    return values
+
+class DashboardMetricsRefresher:
+    """Background task refreshing the dashboard snapshot every few seconds"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await refresh_dashboard_metrics(db)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Dashboard metrics refresh failed: {e}")
+            await asyncio.sleep(settings.DASHBOARD_METRICS_REFRESH_SECONDS)
+
+dashboard_metrics_refresher = DashboardMetricsRefresher()
@@ -1,15 +1,65 @@
+from fastapi import Depends
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
+from .read_your_writes import reads_from_primary
+from .db_pool import (
+    InstrumentedQueuePool, InstrumentedAsyncQueuePool,
+    InstrumentedReplicaQueuePool, InstrumentedAsyncReplicaQueuePool, pool_options
+)
 
-engine = create_engine(settings.DATABASE_URL)
+engine = create_engine(settings.DATABASE_URL, poolclass=InstrumentedQueuePool, **pool_options())
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# asyncio engine for async def routes; same database, asyncpg driver
+async_engine = create_async_engine(
+    make_url(settings.DATABASE_URL).set(drivername="postgresql+asyncpg"),
+    poolclass=InstrumentedAsyncQueuePool,
+    **pool_options()
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# Read replica engines for read-only GET handlers; without a separate replica
+# they are the primary engines, so a worker holds two pools rather than four
+if settings.DATABASE_REPLICA_URL == settings.DATABASE_URL:
+    replica_engine = engine
+    ReplicaSessionLocal = SessionLocal
+    async_replica_engine = async_engine
+    AsyncReplicaSessionLocal = AsyncSessionLocal
+else:
+    replica_engine = create_engine(settings.DATABASE_REPLICA_URL, poolclass=InstrumentedReplicaQueuePool, **pool_options())
+    ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+
+    async_replica_engine = create_async_engine(
+        make_url(settings.DATABASE_REPLICA_URL).set(drivername="postgresql+asyncpg"),
+        poolclass=InstrumentedAsyncReplicaQueuePool,
+        **pool_options()
+    )
+    AsyncReplicaSessionLocal = async_sessionmaker(async_replica_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def get_read_db(use_primary: bool = Depends(reads_from_primary)):
+    db = SessionLocal() if use_primary else ReplicaSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db(use_primary: bool = Depends(reads_from_primary)):
+    session_factory = AsyncSessionLocal if use_primary else AsyncReplicaSessionLocal
+    async with session_factory() as db:
+        yield db
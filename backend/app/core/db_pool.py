@@ -0,0 +1,120 @@
+"""
+Instrumented connection pools - live stats and checkout wait-time histogram per engine
+"""
+import logging
+import threading
+import time
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in milliseconds for the checkout wait histogram
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+class WaitHistogram:
+    """Cumulative histogram of pool checkout wait times"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        self.timeouts = 0
+
+    def observe(self, wait_ms: float):
+        with self._lock:
+            for i, bound in enumerate(WAIT_BUCKETS_MS):
+                if wait_ms <= bound:
+                    self.buckets[i] += 1
+                    break
+            else:
+                self.buckets[-1] += 1
+            self.count += 1
+            self.sum_ms += wait_ms
+            self.max_ms = max(self.max_ms, wait_ms)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            cumulative = 0
+            buckets = {}
+            for bound, hits in zip(list(WAIT_BUCKETS_MS) + ["+Inf"], self.buckets):
+                cumulative += hits
+                buckets[str(bound)] = cumulative
+            return {
+                "count": self.count,
+                "sum_ms": round(self.sum_ms, 3),
+                "max_ms": round(self.max_ms, 3),
+                "timeouts": self.timeouts,
+                "buckets_ms": buckets
+            }
+
+# Histograms outlive pool instances (engine.dispose() builds a new pool)
+_histograms = {}
+
+class _InstrumentedPoolMixin:
+    """Times every checkout and logs the ones that waited too long"""
+
+    pool_name = "db"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.wait_histogram.record_timeout()
+            raise
+        wait_ms = (time.perf_counter() - start) * 1000
+        self.wait_histogram.observe(wait_ms)
+        if wait_ms > settings.DB_POOL_SLOW_CHECKOUT_MS:
+            logger.warning(
+                f"Waited {wait_ms:.1f}ms for a '{self.pool_name}' pool connection "
+                f"(checked out: {self.checkedout()}, overflow: {self.overflow()})"
+            )
+        return conn
+
+    @property
+    def wait_histogram(self) -> WaitHistogram:
+        return _histograms.setdefault(self.pool_name, WaitHistogram())
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pool_name = "sync"
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pool_name = "async"
+
+class InstrumentedReplicaQueuePool(InstrumentedQueuePool):
+    pool_name = "sync_replica"
+
+class InstrumentedAsyncReplicaQueuePool(InstrumentedAsyncQueuePool):
+    pool_name = "async_replica"
+
+def pool_options() -> dict:
+    """Engine keyword arguments shared by the sync and async engines"""
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+def pool_stats(engine) -> dict:
+    """Live state of an engine's pool"""
+    pool = engine.pool
+    stats = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+    }
+    if isinstance(pool, _InstrumentedPoolMixin):
+        stats["checkout_wait"] = pool.wait_histogram.snapshot()
+    return stats
@@ -1,16 +1,22 @@
-from fastapi import Depends, HTTPException, status
+import ipaddress
+from typing import Optional
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from .database import get_db
+from .config import settings
+from .database import get_db, get_async_db
+from .principals import Principal, load_principal, load_principal_async
+from .revocation import revocation_filter
 from .security import verify_token
-from ..models.user import User, UserRole
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+_METRICS_NETWORKS = tuple(ipaddress.ip_network(address, strict=False) for address in settings.METRICS_ALLOWED_IPS)
+_PROXY_NETWORKS = tuple(ipaddress.ip_network(address, strict=False) for address in settings.TRUSTED_PROXY_IPS)
+
+def get_token_claims(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     token = credentials.credentials
     payload = verify_token(token)
     
@@ -20,14 +26,59 @@ def get_current_user(
             detail="Invalid token"
         )
     
-    user_id = payload.get("sub")
-    if user_id is None:
+    # In-process lookup; revocations reach every worker over pub/sub
+    if revocation_filter.is_revoked(payload.get("jti")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revoked"
+        )
+    
+    return payload
+
+def _claims_user_id(claims: dict) -> int:
+    try:
+        return int(claims.get("sub"))
+    except (TypeError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token"
         )
+
+def get_current_user(
+    claims: dict = Depends(get_token_claims),
+    db: Session = Depends(get_db)
+) -> Principal:
+    # Built from the token's claims; the session is only used for tokens issued without them
+    principal = Principal.from_claims(claims)
+    if principal is not None:
+        return principal
+    
+    user = load_principal(db, _claims_user_id(claims))
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    return user
+
+def get_admin_user(current_user: Principal = Depends(get_current_user)) -> Principal:
+    if "admin:read" not in current_user.permissions:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
+
+async def get_current_user_async(
+    claims: dict = Depends(get_token_claims),
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    principal = Principal.from_claims(claims)
+    if principal is not None:
+        return principal
+    
+    user = await load_principal_async(db, _claims_user_id(claims))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -36,10 +87,42 @@ def get_current_user(
     
     return user
 
-def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
-    if current_user.role not in [UserRole.ADMIN, UserRole.SUPERADMIN]:
+async def get_admin_user_async(current_user: Principal = Depends(get_current_user_async)) -> Principal:
+    if "admin:read" not in current_user.permissions:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
+
+def _metrics_peer_allowed(request: Request) -> bool:
+    if not request.client:
+        return False
+    try:
+        peer = ipaddress.ip_address(request.client.host)
+    except ValueError:
+        return False
+    # Whatever a proxy relays comes from the outside, whatever its own address
+    if "x-real-ip" in request.headers and any(peer in network for network in _PROXY_NETWORKS):
+        return False
+    return any(peer in network for network in _METRICS_NETWORKS)
+
+def get_metrics_access(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+):
+    """Allow /metrics/* from METRICS_ALLOWED_IPS, or with an admin access token"""
+    if _metrics_peer_allowed(request):
+        return
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required"
+        )
+    # Claims only, so a metrics scrape never touches the database
+    principal = Principal.from_claims(get_token_claims(credentials))
+    if principal is None or "admin:read" not in principal.permissions:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin access required"
         )
-    return current_user
\ No newline at end of file
@@ -1,6 +1,7 @@
 """
 Enhanced Security Module - Production Ready
-Cookie-based JWT with Refresh Tokens, CSRF Protection, Rate Limiting
+Cookie-based JWT with Refresh Tokens, CSRF Protection
+(rate limiting lives in rate_limit.py, Redis access in redis_pool.py)
 """
 import secrets
 import hashlib
@@ -14,8 +15,9 @@ import pyotp
 from jose import JWTError, jwt
 from fastapi import HTTPException, status, Request, Response
 from sqlalchemy.orm import Session
-import redis
 import json
+from .redis_pool import RedisUnavailable, redis_command
+from .revocation import revocation_filter
 
 class SecurityConfig:
     # Strong secret keys (generate with: secrets.token_urlsafe(32))
@@ -66,8 +68,7 @@ class PasswordManager:
 class TokenManager:
     """JWT Token Management with Refresh Token Rotation"""
     
-    def __init__(self, redis_client: redis.Redis):
-        self.redis = redis_client
+    def __init__(self):
         self.password_manager = PasswordManager()
     
     def create_access_token(self, user_id: int, permissions: list = None) -> str:
@@ -102,16 +103,15 @@ class TokenManager:
             if payload.get("type") != token_type:
                 return None
             
-            # Check if token is blacklisted
-            jti = payload.get("jti")
-            if jti and self.redis.get(f"blacklist:{jti}"):
+            # Check if token is blacklisted; the local filter avoids a Redis round trip
+            if revocation_filter.is_revoked(payload.get("jti")):
                 return None
             
             return payload
         except JWTError:
             return None
     
-    def blacklist_token(self, token: str):
+    async def blacklist_token(self, token: str):
         """Add token to blacklist"""
         try:
             payload = jwt.decode(token, SecurityConfig.JWT_SECRET_KEY, algorithms=["HS256"])
@@ -119,10 +119,7 @@ class TokenManager:
             exp = payload.get("exp")
             
             if jti and exp:
-                # Set expiry to match token expiry
-                ttl = exp - datetime.utcnow().timestamp()
-                if ttl > 0:
-                    self.redis.setex(f"blacklist:{jti}", int(ttl), "1")
+                await revocation_filter.revoke(jti, exp)
         except JWTError:
             pass
 
@@ -164,39 +161,21 @@ class CSRFProtection:
         except (ValueError, TypeError):
             return False
 
-class RateLimiter:
-    """Redis-based rate limiting"""
-    
-    def __init__(self, redis_client: redis.Redis):
-        self.redis = redis_client
-    
-    def is_rate_limited(self, key: str, limit: int, window: int) -> bool:
-        """Check if key is rate limited"""
-        current = self.redis.get(key)
-        if current is None:
-            self.redis.setex(key, window, 1)
-            return False
-        
-        if int(current) >= limit:
-            return True
-        
-        self.redis.incr(key)
-        return False
-    
-    def get_remaining_attempts(self, key: str, limit: int) -> int:
-        """Get remaining attempts"""
-        current = self.redis.get(key)
-        if current is None:
-            return limit
-        return max(0, limit - int(current))
-
 class SessionManager:
     """Manage user sessions with device tracking"""
     
-    def __init__(self, redis_client: redis.Redis):
-        self.redis = redis_client
-    
-    def create_session(self, user_id: int, request: Request) -> str:
+    async def _call(self, operation):
+        # Sessions cannot fall back to local state, so an unavailable Redis fails fast with 503
+        try:
+            return await redis_command(operation)
+        except RedisUnavailable:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Session store unavailable, please try again shortly",
+                headers={"Retry-After": "5"}
+            )
+    
+    async def create_session(self, user_id: int, request: Request) -> str:
         """Create new session"""
         session_id = str(uuid4())
         
@@ -209,33 +188,26 @@ class SessionManager:
         }
         
         # Store in Redis with expiry
-        self.redis.setex(
+        await self._call(lambda client: client.setex(
             f"session:{session_id}",
             SecurityConfig.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600,
             json.dumps(session_data)
-        )
+        ))
         
         return session_id
     
-    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+    async def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get session data"""
-        data = self.redis.get(f"session:{session_id}")
+        data = await self._call(lambda client: client.get(f"session:{session_id}"))
         if data:
             return json.loads(data)
         return None
     
-    def revoke_session(self, session_id: str):
+    async def revoke_session(self, session_id: str):
         """Revoke session"""
-        self.redis.delete(f"session:{session_id}")
-
-# Initialize global instances
-redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379')
-if 'redis://:' in redis_url:  # Handle password in URL
-    redis_client = redis.from_url(redis_url, decode_responses=True)
-else:
-    redis_client = redis.Redis(host='localhost', port=6379, db=0, decode_responses=True)
+        await self._call(lambda client: client.delete(f"session:{session_id}"))
 
-token_manager = TokenManager(redis_client)
-rate_limiter = RateLimiter(redis_client)
-session_manager = SessionManager(redis_client)
+# Initialize global instances; Redis access goes through the shared pool in redis_pool.py
+token_manager = TokenManager()
+session_manager = SessionManager()
 password_manager = PasswordManager()
\ No newline at end of file
@@ -0,0 +1,70 @@
+"""
+Streaming CSV/NDJSON exports over a server-side cursor
+"""
+import csv
+import enum
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator
+from fastapi.responses import StreamingResponse
+from .config import settings
+
+class ExportFormat(str, enum.Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
+
+def _export_value(value: Any) -> Any:
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+async def _stream_rows(stmt, export_format: ExportFormat, session_factory) -> AsyncIterator[str]:
+    # The session is opened here, not taken from a dependency, so it lives
+    # exactly as long as the response body is being sent
+    async with session_factory() as db:
+        result = await db.stream(stmt.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        columns = list(result.keys())
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if export_format == ExportFormat.CSV:
+            writer.writerow(columns)
+
+        # One chunk per fetched partition keeps memory flat whatever the table size
+        async for partition in result.partitions():
+            for row in partition:
+                values = [_export_value(value) for value in row]
+                if export_format == ExportFormat.CSV:
+                    writer.writerow([
+                        json.dumps(value) if isinstance(value, (dict, list)) else value
+                        for value in values
+                    ])
+                else:
+                    buffer.write(json.dumps(dict(zip(columns, values)), default=str))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue()
+
+def streaming_export(stmt, export_format: ExportFormat, name: str, session_factory) -> StreamingResponse:
+    """Stream the rows of a Core select as a downloadable CSV or NDJSON file"""
+    filename = f"{name}-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.{export_format.value}"
+    return StreamingResponse(
+        _stream_rows(stmt, export_format, session_factory),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
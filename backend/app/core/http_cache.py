@@ -0,0 +1,51 @@
+"""
+HTTP caching helpers - ETag / If-None-Match and Cache-Control for catalog routes
+"""
+import hashlib
+from typing import Optional
+from fastapi import Request, Response, status
+from .cache import catalog_version, invalidation_listener, read_catalog_version
+
+# Cache-Control policy per catalog route
+CACHE_POLICIES = {
+    "products": "public, max-age=30, stale-while-revalidate=60",
+    "product": "public, max-age=60, stale-while-revalidate=300",
+    "categories": "public, max-age=300, stale-while-revalidate=3600",
+}
+
+def get_catalog_version() -> int:
+    """The catalog version for ETags and cache keys
+
+    Served from memory while the invalidation listener is connected; only
+    queried from the primary while it is not, or before a version is known.
+    """
+    version = catalog_version.current() if invalidation_listener.connected else None
+    if version is None:
+        version = read_catalog_version()
+    return version
+
+def catalog_etag(version: int, route: str, variant: str = "") -> str:
+    """Build a strong ETag from the catalog version and the request variant"""
+    digest = hashlib.sha1(f"{route}?{variant}".encode("utf-8")).hexdigest()[:16]
+    return f'"{version}-{digest}"'
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison function
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag[2:] == etag if tag.startswith("W/") else tag == etag for tag in candidates)
+
+def not_modified(request: Request, etag: str, route: str) -> Optional[Response]:
+    """Return a 304 response when the client already holds this representation"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": CACHE_POLICIES[route]}
+        )
+    return None
+
+def set_cache_headers(response: Response, etag: str, route: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_POLICIES[route]
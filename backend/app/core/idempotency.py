@@ -0,0 +1,95 @@
+"""
+Idempotency-Key support for retried mutations
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+from fastapi import Header, HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from .config import settings
+from ..models.idempotency_key import IdempotencyKey
+
+REPLAY_HEADER = "Idempotent-Replayed"
+
+def get_idempotency_key(
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255)
+) -> Optional[str]:
+    """FastAPI dependency reading the optional Idempotency-Key header"""
+    return idempotency_key
+
+def request_fingerprint(route: str, payload: Any = None) -> str:
+    """Hash the route and request payload so a key cannot be reused for another request"""
+    body = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{route}:{body}".encode("utf-8")).hexdigest()
+
+def begin_idempotent_request(db: Session, user_id: int, key: Optional[str], fingerprint: str) -> Optional[JSONResponse]:
+    """Reserve the key for this request, or return the stored response of an earlier one
+
+    The reservation is written in the caller's transaction. A concurrent retry
+    blocks on the primary key until the first request commits (and then gets
+    its response) or rolls back (and then runs normally).
+    """
+    if not key:
+        return None
+    
+    now = datetime.now(timezone.utc)
+    reserved = db.execute(
+        insert(IdempotencyKey)
+        .values(
+            user_id=user_id,
+            key=key,
+            request_hash=fingerprint,
+            expires_at=now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+        )
+        .on_conflict_do_nothing(index_elements=["user_id", "key"])
+        .returning(IdempotencyKey.key)
+    ).first()
+    if reserved:
+        return None
+    
+    record = db.query(IdempotencyKey).filter(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.key == key
+    ).first()
+    
+    if record is None or record.expires_at < now:
+        # Expired keys are recycled lazily
+        if record is not None:
+            db.delete(record)
+            db.flush()
+        return begin_idempotent_request(db, user_id, key, fingerprint)
+    
+    if record.request_hash != fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used for a different request"
+        )
+    
+    if record.response_body is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still being processed"
+        )
+    
+    return JSONResponse(
+        status_code=record.status_code,
+        content=record.response_body,
+        headers={REPLAY_HEADER: "true"}
+    )
+
+def complete_idempotent_request(db: Session, user_id: int, key: Optional[str], response_body: Any, status_code: int = status.HTTP_200_OK):
+    """Store the response for the reserved key; committed together with the caller's changes"""
+    if not key:
+        return
+    
+    db.query(IdempotencyKey).filter(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.key == key
+    ).update(
+        {"response_body": jsonable_encoder(response_body), "status_code": status_code},
+        synchronize_session=False
+    )
@@ -0,0 +1,281 @@
+"""
+Background bulk import jobs - persisted in import_jobs and run by an in-process worker
+"""
+import asyncio
+import codecs
+import csv
+import logging
+import os
+import shutil
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy import select, update, func, or_, and_, literal
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from .config import settings
+from .database import AsyncSessionLocal
+from .product_import import ProductImporter, iter_csv_batches
+from ..models.import_job import ImportJob, ImportJobStatus, ImportMode
+
+logger = logging.getLogger(__name__)
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+class ImportJobLeaseLost(Exception):
+    """Another worker reclaimed the job after its heartbeat went stale"""
+
+def save_upload(source: BinaryIO, destination: Path) -> int:
+    """Copy the upload to disk and return its number of data rows"""
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    with open(destination, "wb") as out:
+        shutil.copyfileobj(source, out)
+    with open(destination, "rb") as stream:
+        return sum(1 for _ in csv.DictReader(codecs.iterdecode(stream, "utf-8")))
+
+async def submit_import_job(db: AsyncSession, upload: UploadFile, user_id: int, mode: ImportMode = ImportMode.INSERT) -> ImportJob:
+    """Persist the upload and queue it for the import worker"""
+    job_id = uuid.uuid4().hex
+    file_path = Path(settings.IMPORT_JOB_DIR) / f"{job_id}.csv"
+    try:
+        total_rows = await run_in_threadpool(save_upload, upload.file, file_path)
+    except (UnicodeDecodeError, csv.Error) as e:
+        file_path.unlink(missing_ok=True)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error reading file: {str(e)}"
+        )
+
+    job = ImportJob(
+        id=job_id,
+        kind="products",
+        mode=mode,
+        status=ImportJobStatus.QUEUED,
+        filename=upload.filename,
+        file_path=str(file_path),
+        created_by=user_id,
+        total_rows=total_rows,
+        errors=[]
+    )
+    db.add(job)
+    await db.commit()
+    import_job_worker.wake()
+    return job
+
+def import_job_progress(job: ImportJob) -> dict:
+    """Describe a job's progress, throughput and estimated time remaining"""
+    rows_per_second = None
+    eta_seconds = None
+
+    elapsed, done = 0, 0
+    if job.status == ImportJobStatus.RUNNING and job.run_started_at:
+        # Measured over the current run so a resumed job reports its real rate
+        elapsed = (datetime.now(timezone.utc) - job.run_started_at).total_seconds()
+        done = job.rows_processed - job.run_start_rows
+    elif job.finished_at and job.started_at:
+        elapsed = (job.finished_at - job.started_at).total_seconds()
+        done = job.rows_processed
+
+    if elapsed > 0 and done > 0:
+        rows_per_second = done / elapsed
+        if job.status == ImportJobStatus.RUNNING and job.total_rows is not None:
+            eta_seconds = max(job.total_rows - job.rows_processed, 0) / rows_per_second
+
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "mode": job.mode.value,
+        "status": job.status.value,
+        "filename": job.filename,
+        "total_rows": job.total_rows,
+        "rows_processed": job.rows_processed,
+        "inserted": job.created_count,
+        "updated": job.updated_count,
+        "unchanged": job.unchanged_count,
+        "failed": job.error_count,
+        "errors": job.errors,
+        "rows_per_second": round(rows_per_second, 1) if rows_per_second is not None else None,
+        "eta_seconds": round(eta_seconds) if eta_seconds is not None else None,
+        "failure_reason": job.failure_reason,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at
+    }
+
+class JobProductImporter(ProductImporter):
+    """ProductImporter that commits job progress in the same transaction as each batch"""
+
+    def __init__(self, db: AsyncSession, job_id: str, mode: ImportMode, error_count: int):
+        super().__init__(db, mode)
+        self.job_id = job_id
+        self.error_count = error_count
+
+    async def commit_batch(self, batch: List[Tuple[int, dict]]):
+        stored = self.errors[:max(settings.IMPORT_JOB_MAX_STORED_ERRORS - self.error_count, 0)]
+        values = {
+            "rows_processed": ImportJob.rows_processed + len(batch),
+            "created_count": ImportJob.created_count + len(self.created_products),
+            "updated_count": ImportJob.updated_count + self.updated_count,
+            "unchanged_count": ImportJob.unchanged_count + self.unchanged_count,
+            "error_count": ImportJob.error_count + len(self.errors),
+            "last_committed_row": batch[-1][0],
+            "heartbeat_at": func.now()
+        }
+        if stored:
+            values["errors"] = ImportJob.errors.op("||")(literal(stored, JSONB))
+
+        result = await self.db.execute(
+            update(ImportJob)
+            .where(ImportJob.id == self.job_id, ImportJob.worker_id == WORKER_ID)
+            .values(**values)
+        )
+        if result.rowcount == 0:
+            await self.db.rollback()
+            raise ImportJobLeaseLost(self.job_id)
+        await self.db.commit()
+
+        self.error_count += len(self.errors)
+        self.created_products = []
+        self.updated_count = 0
+        self.unchanged_count = 0
+        self.errors = []
+
+async def claim_import_job() -> Optional[str]:
+    """Claim the oldest queued job, or a running one whose worker stopped heartbeating"""
+    stale_before = func.now() - timedelta(seconds=settings.IMPORT_JOB_STALE_SECONDS)
+    async with AsyncSessionLocal() as db:
+        job_id = await db.scalar(
+            select(ImportJob.id)
+            .where(or_(
+                ImportJob.status == ImportJobStatus.QUEUED,
+                and_(ImportJob.status == ImportJobStatus.RUNNING, ImportJob.heartbeat_at < stale_before)
+            ))
+            .order_by(ImportJob.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        if job_id is None:
+            return None
+
+        await db.execute(
+            update(ImportJob)
+            .where(ImportJob.id == job_id)
+            .values(
+                status=ImportJobStatus.RUNNING,
+                worker_id=WORKER_ID,
+                heartbeat_at=func.now(),
+                run_started_at=func.now(),
+                run_start_rows=ImportJob.rows_processed,
+                started_at=func.coalesce(ImportJob.started_at, func.now())
+            )
+        )
+        await db.commit()
+        return job_id
+
+async def _finish_job(db: AsyncSession, job_id: str, job_status: ImportJobStatus, failure_reason: Optional[str] = None):
+    await db.execute(
+        update(ImportJob)
+        .where(ImportJob.id == job_id, ImportJob.worker_id == WORKER_ID)
+        .values(status=job_status, failure_reason=failure_reason, worker_id=None, finished_at=func.now())
+    )
+    await db.commit()
+
+async def run_import_job(job_id: str):
+    """Run a claimed job from its last committed batch to the end of the file"""
+    async with AsyncSessionLocal() as db:
+        job = await db.get(ImportJob, job_id)
+        file_path = job.file_path
+        if not Path(file_path).is_file():
+            # Nothing to resume from; retrying would only fail the same way
+            logger.error(f"Import job {job_id} failed: upload {file_path} is missing")
+            await _finish_job(db, job_id, ImportJobStatus.FAILED, "Uploaded file is no longer available; upload it again")
+            return
+        importer = JobProductImporter(db, job_id, job.mode, job.error_count)
+
+        try:
+            await importer.load_categories()
+            with open(file_path, "rb") as stream:
+                batches = iter_csv_batches(stream, settings.PRODUCT_IMPORT_BATCH_SIZE, job.last_committed_row)
+                while True:
+                    batch = await run_in_threadpool(next, batches, None)
+                    if batch is None:
+                        break
+                    await importer.import_batch(batch)
+        except ImportJobLeaseLost:
+            logger.warning(f"Import job {job_id} was reclaimed by another worker")
+            return
+        except Exception as e:
+            logger.error(f"Import job {job_id} failed: {e}")
+            await db.rollback()
+            await _finish_job(db, job_id, ImportJobStatus.FAILED, str(e))
+        else:
+            await _finish_job(db, job_id, ImportJobStatus.COMPLETED)
+
+        Path(file_path).unlink(missing_ok=True)
+
+async def release_import_job(job_id: str):
+    """Hand an interrupted job back to the queue so it resumes without waiting to go stale"""
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(ImportJob)
+            .where(ImportJob.id == job_id, ImportJob.worker_id == WORKER_ID)
+            .values(status=ImportJobStatus.QUEUED, worker_id=None)
+        )
+        await db.commit()
+
+class ImportJobWorker:
+    """Background task running one import job at a time in this process"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._current_job: Optional[str] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def wake(self):
+        if self._wake is not None:
+            self._wake.set()
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._current_job:
+            try:
+                await release_import_job(self._current_job)
+            except Exception as e:
+                logger.warning(f"Failed to release import job {self._current_job}: {e}")
+
+    async def _run(self):
+        while True:
+            try:
+                job_id = await claim_import_job()
+                if job_id:
+                    self._current_job = job_id
+                    await run_import_job(job_id)
+                    self._current_job = None
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Import job worker error: {e}")
+                self._current_job = None
+
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), settings.IMPORT_JOB_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+import_job_worker = ImportJobWorker()
@@ -0,0 +1,189 @@
+"""
+Per-route rate limits and load shedding as pure ASGI middleware, ahead of routing and DB sessions
+"""
+import asyncio
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from .config import settings
+from .rate_limit import RateLimitResult, client_ip, rate_limiter
+from .security import verify_token
+
+@dataclass(frozen=True)
+class RouteBudget:
+    name: str
+    method: str
+    path: str
+    user_limit: Optional[int]  # Per authenticated user; None limits by IP only
+    ip_limit: int  # Only enforced when the client IP is known, see settings.TRUSTED_PROXY_IPS
+    window_seconds: int
+    prefix: bool = False
+
+    def matches(self, method: str, path: str) -> bool:
+        if method != self.method:
+            return False
+        if self.prefix:
+            return path.startswith(self.path)
+        return path.rstrip("/") == self.path
+
+# Expensive endpoints; these are also the first to be shed under load
+ROUTE_BUDGETS = (
+    RouteBudget("catalog", "GET", "/api/v1/products", 120, 300, 60),
+    RouteBudget("checkout", "POST", "/api/v1/orders", 10, 30, 60),
+    RouteBudget("bulk-upload", "POST", "/api/v1/admin/products/bulk-upload", 5, 10, 300),
+    RouteBudget("exports", "GET", "/api/v1/admin/exports/", 10, 20, 60, prefix=True),
+    RouteBudget("register", "POST", "/api/v1/auth/register", None, 10, 3600),
+    RouteBudget("forgot-password", "POST", "/api/v1/auth/forgot-password", None, 5, 3600),
+    RouteBudget("refresh", "POST", "/api/v1/auth/refresh", None, 60, 60),
+)
+
+# Never shed, so orchestration and monitoring keep working under overload
+SHED_EXEMPT_PATHS = ("/health", "/metrics/")
+
+def route_budget(method: str, path: str) -> Optional[RouteBudget]:
+    for budget in ROUTE_BUDGETS:
+        if budget.matches(method, path):
+            return budget
+    return None
+
+class EventLoopLagMonitor:
+    """Background task measuring how late the event loop wakes from a short sleep"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.lag_ms = 0.0
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.lag_ms = 0.0
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        interval = settings.LOAD_SHED_LAG_CHECK_INTERVAL_MS / 1000
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            self.lag_ms = max(loop.time() - started - interval, 0) * 1000
+
+loop_lag_monitor = EventLoopLagMonitor()
+
+class LoadShedder:
+    """In-flight request count for this worker and the shed/throttle decisions built on it"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.shed = 0
+        self.throttled = 0
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "loop_lag_ms": round(loop_lag_monitor.lag_ms, 1),
+            "shed": self.shed,
+            "throttled": self.throttled
+        }
+
+    def overloaded(self, budget: Optional[RouteBudget]) -> bool:
+        if self.in_flight >= settings.LOAD_SHED_MAX_IN_FLIGHT:
+            return True
+        if budget is None:
+            return False
+        return (
+            self.in_flight >= settings.LOAD_SHED_SOFT_IN_FLIGHT
+            or loop_lag_monitor.lag_ms >= settings.LOAD_SHED_MAX_LOOP_LAG_MS
+        )
+
+load_shedder = LoadShedder()
+
+class LoadSheddingMiddleware:
+    """Rejects work early instead of letting every request time out together
+
+    Budgeted (expensive) routes are shed with 503 once event-loop lag or the
+    number of in-flight requests passes the soft threshold; every other route
+    only at the hard in-flight cap. Requests that get through are then checked
+    against their route budget, per user and per IP, and get 429 when over it.
+    Per-IP budgets only apply when client_ip() can name the real client.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def _check_budget(self, budget: RouteBudget, scope) -> Optional[RateLimitResult]:
+        keys: List[Tuple[str, int]] = []
+        ip = client_ip(scope)
+        if ip is not None:
+            keys.append((f"route:{budget.name}:ip:{ip}", budget.ip_limit))
+
+        if budget.user_limit is not None:
+            authorization = Headers(scope=scope).get("authorization", "")
+            scheme, _, token = authorization.partition(" ")
+            payload = verify_token(token) if scheme.lower() == "bearer" and token else None
+            if payload and payload.get("sub"):
+                keys.insert(0, (f"route:{budget.name}:user:{payload['sub']}", budget.user_limit))
+        if not keys:
+            return None
+
+        # The most restrictive key decides
+        results = await asyncio.gather(*(
+            rate_limiter.hit(key, limit, budget.window_seconds) for key, limit in keys
+        ))
+        denied = [result for result in results if not result.allowed]
+        if denied:
+            return max(denied, key=lambda result: result.retry_after)
+        return min(results, key=lambda result: result.remaining)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        budget = route_budget(scope["method"], path)
+
+        if not path.startswith(SHED_EXEMPT_PATHS) and load_shedder.overloaded(budget):
+            load_shedder.shed += 1
+            response = JSONResponse(
+                {"detail": "Server is busy, please try again shortly"},
+                status_code=503,
+                headers={"Retry-After": "1"}
+            )
+            await response(scope, receive, send)
+            return
+
+        limit = None
+        if budget is not None:
+            limit = await self._check_budget(budget, scope)
+            if limit is not None and not limit.allowed:
+                load_shedder.throttled += 1
+                response = JSONResponse(
+                    {"detail": "Rate limit exceeded. Try again later."},
+                    status_code=429,
+                    headers=limit.headers
+                )
+                await response(scope, receive, send)
+                return
+
+        async def send_with_limit_headers(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                for name, value in limit.headers.items():
+                    headers.append((name.lower().encode("latin-1"), value.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        load_shedder.in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_limit_headers if limit else send)
+        finally:
+            load_shedder.in_flight -= 1
@@ -0,0 +1,86 @@
+"""
+Keyset (cursor) pagination helpers
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_, text
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+TOTAL_ESTIMATED_HEADER = "X-Total-Count-Estimated"
+
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    """Encode the (sort_key, id) of the last row into an opaque cursor"""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = json.dumps([sort_value, row_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, sort_column) -> tuple:
+    """Decode a cursor back into a (sort_key, id) pair"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        if sort_value is not None and sort_column.type.python_type is datetime:
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, int(row_id)
+    except (ValueError, TypeError, NotImplementedError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def keyset_paginate(query, sort_column, id_column, cursor: Optional[str], skip: int, limit: Optional[int], descending: bool = False):
+    """Order the query by (sort_key, id) and page it by cursor or by legacy offset"""
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column, id_column)
+
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor, sort_column)
+        keys = tuple_(sort_column, id_column)
+        query = query.filter(keys < (sort_value, row_id) if descending else keys > (sort_value, row_id))
+        # Redundant with the row comparison, but lets Postgres prune partitions on sort_column
+        query = query.filter(sort_column <= sort_value if descending else sort_column >= sort_value)
+    elif skip:
+        query = query.offset(skip)
+
+    if limit is not None:
+        query = query.limit(limit)
+
+    return query
+
+def next_cursor(rows: List[Any], limit: Optional[int], sort_attr: str) -> Optional[str]:
+    """Return the cursor for the next page, or None when the current page is not full"""
+    if limit is None or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(getattr(last, sort_attr), last.id)
+
+def set_next_cursor(response: Response, cursor: Optional[str]):
+    """Expose the next page cursor on the response"""
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+
+def escape_like(term: str) -> str:
+    """Escape LIKE wildcards so user input only ever matches literally"""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+async def estimated_row_count(db, table_name: str) -> Optional[int]:
+    """Planner row estimate from pg_class; None if the table was never analyzed"""
+    estimate = await db.scalar(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+        {"table_name": table_name}
+    )
+    if estimate is None or estimate < 0:
+        return None
+    return estimate
+
+def set_total_count(response: Response, total: int, estimated: bool = False):
+    """Expose the (possibly estimated) total number of matching rows"""
+    response.headers[TOTAL_COUNT_HEADER] = str(total)
+    response.headers[TOTAL_ESTIMATED_HEADER] = "true" if estimated else "false"
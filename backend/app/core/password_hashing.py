@@ -0,0 +1,95 @@
+"""
+Password hashing on a dedicated process pool, off the event loop and the shared threadpool
+"""
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from fastapi import HTTPException, status
+from sqlalchemy import update
+from .config import settings
+from .database import AsyncSessionLocal
+from .security import verify_password, get_password_hash, needs_rehash
+from ..models.user import User
+
+logger = logging.getLogger(__name__)
+
+class PasswordHasher:
+    """Runs hash/verify on a small process pool with a bounded number of pending jobs"""
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn, not fork: the parent already runs threads and an event loop
+                self._executor = ProcessPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= settings.PASSWORD_HASH_MAX_PENDING:
+                self._rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Server is busy, please try again shortly",
+                    headers={"Retry-After": "1"}
+                )
+            self._pending += 1
+        try:
+            return await asyncio.wrap_future(self._get_executor().submit(fn, *args))
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": settings.PASSWORD_HASH_WORKERS,
+                "pending": self._pending,
+                "max_pending": settings.PASSWORD_HASH_MAX_PENDING,
+                "completed": self._completed,
+                "rejected": self._rejected
+            }
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+password_hasher = PasswordHasher()
+
+async def rehash_password(user_id: int, plain_password: str, old_hash: str):
+    """Upgrade a legacy hash after a successful login (run as a background task)"""
+    if not needs_rehash(old_hash):
+        return
+    try:
+        new_hash = await password_hasher.hash(plain_password)
+        async with AsyncSessionLocal() as db:
+            # Compare-and-set so a password changed meanwhile is never overwritten
+            await db.execute(
+                update(User)
+                .where(User.id == user_id, User.hashed_password == old_hash)
+                .values(hashed_password=new_hash)
+            )
+            await db.commit()
+    except Exception as e:
+        logger.warning(f"Failed to rehash password for user {user_id}: {e}")
@@ -0,0 +1,112 @@
+"""
+Authenticated principal cache - what auth dependencies need about a user, without a query per request
+"""
+from dataclasses import dataclass
+from typing import Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from .cache import TTLCache, invalidation_listener
+from .config import settings
+from ..models.user import User, UserRole
+
+PRINCIPAL_CHANNEL = "principal_changes"
+
+ADMIN_PERMISSIONS = ("admin:read", "admin:write")
+ROLE_PERMISSIONS = {
+    UserRole.ADMIN: ADMIN_PERMISSIONS,
+    UserRole.SUPERADMIN: ADMIN_PERMISSIONS + ("users:manage",),
+}
+
+def role_permissions(role: Optional[UserRole]) -> Tuple[str, ...]:
+    return ROLE_PERMISSIONS.get(role, ())
+
+@dataclass(frozen=True)
+class Principal:
+    """Immutable snapshot of the authenticated user, safe to share across requests"""
+    id: int
+    email: str
+    username: str
+    full_name: str
+    role: UserRole
+    is_active: bool
+    permissions: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            username=user.username,
+            full_name=user.full_name,
+            role=user.role,
+            is_active=user.is_active,
+            permissions=role_permissions(user.role)
+        )
+
+    @classmethod
+    def from_claims(cls, payload: dict) -> Optional["Principal"]:
+        """Rebuild the principal from access token claims; None for tokens issued without them"""
+        try:
+            return cls(
+                id=int(payload["sub"]),
+                email=payload["email"],
+                username=payload["username"],
+                full_name=payload["name"],
+                role=UserRole(payload["role"]),
+                is_active=True,
+                permissions=tuple(payload.get("permissions", ()))
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def claims(self) -> dict:
+        """Access token claims; tokens are only issued to active users"""
+        return {
+            "sub": str(self.id),
+            "email": self.email,
+            "username": self.username,
+            "name": self.full_name,
+            "role": (self.role or UserRole.USER).value,
+            "permissions": list(self.permissions)
+        }
+
+principal_cache = TTLCache(settings.PRINCIPAL_CACHE_MAX_ENTRIES, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+def _apply_principal_payload(payload: str):
+    try:
+        principal_cache.delete(int(payload))
+    except ValueError:
+        principal_cache.clear()
+
+invalidation_listener.subscribe(PRINCIPAL_CHANNEL, _apply_principal_payload, principal_cache.clear)
+
+def load_principal(db: Session, user_id: int) -> Optional[Principal]:
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        user = db.get(User, user_id)
+        if user is None:
+            return None
+        principal = Principal.from_user(user)
+        principal_cache.set(user_id, principal)
+    return principal
+
+async def load_principal_async(db: AsyncSession, user_id: int) -> Optional[Principal]:
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        user = await db.get(User, user_id)
+        if user is None:
+            return None
+        principal = Principal.from_user(user)
+        principal_cache.set(user_id, principal)
+    return principal
+
+def notify_principal_change(db: Session, user_id: int):
+    """Invalidate a user's cached principal in every worker once the caller commits"""
+    db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": PRINCIPAL_CHANNEL, "payload": str(user_id)})
+    principal_cache.delete(user_id)
+
+async def notify_principal_change_async(db: AsyncSession, user_id: int):
+    """AsyncSession variant of notify_principal_change"""
+    await db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": PRINCIPAL_CHANNEL, "payload": str(user_id)})
+    principal_cache.delete(user_id)
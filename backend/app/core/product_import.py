@@ -0,0 +1,288 @@
+"""
+Streaming, batched CSV product import
+"""
+import codecs
+import csv
+import hashlib
+import math
+from decimal import Decimal, ROUND_HALF_UP
+from typing import BinaryIO, Dict, Iterator, List, Set, Tuple
+from sqlalchemy import select, func, cast, Text, literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from .cache import notify_catalog_change_async
+from ..models.import_job import ImportMode
+from ..models.product import Product, Category
+
+REQUIRED_FIELDS = ("name", "price", "sku", "category_name")
+TRUE_VALUES = ("true", "1", "yes")
+
+# products.price is numeric(10, 2) and stock_quantity a 32-bit integer
+MAX_PRICE = 99_999_999.99
+MAX_STOCK = 2_147_483_647
+
+# Columns a supplier feed owns; an upsert overwrites these and nothing else
+UPSERT_COLUMNS = (
+    "name", "description", "price", "stock_quantity", "category_id",
+    "manufacturer", "dosage", "is_prescription_required",
+)
+
+def iter_csv_batches(stream: BinaryIO, batch_size: int, after_row: int = 0) -> Iterator[List[Tuple[int, dict]]]:
+    """Yield (row_num, row) batches while decoding the upload line by line
+
+    Rows up to and including after_row are skipped, so an interrupted import
+    can resume after its last committed batch.
+    """
+    reader = csv.DictReader(codecs.iterdecode(stream, "utf-8"))
+    batch = []
+    for row_num, row in enumerate(reader, start=2):  # Start at 2 for header
+        if row_num <= after_row:
+            continue
+        batch.append((row_num, row))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def parse_product_row(row: dict) -> dict:
+    """Validate a CSV row and convert it to Product column values"""
+    for field in REQUIRED_FIELDS:
+        if not (row.get(field) or "").strip():
+            raise ValueError(f"Missing required field '{field}'")
+
+    price = float(row["price"])
+    if not math.isfinite(price) or not 0 <= price <= MAX_PRICE:
+        raise ValueError(f"Price must be between 0 and {MAX_PRICE}")
+    stock_quantity = int(row.get("stock_quantity") or 0)
+    if not 0 <= stock_quantity <= MAX_STOCK:
+        raise ValueError(f"Stock quantity must be between 0 and {MAX_STOCK}")
+
+    return {
+        "name": row["name"].strip(),
+        "description": (row.get("description") or "").strip(),
+        "price": price,
+        "sku": row["sku"].strip(),
+        "stock_quantity": stock_quantity,
+        "category_name": row["category_name"].strip(),
+        "manufacturer": (row.get("manufacturer") or "").strip() or None,
+        "dosage": (row.get("dosage") or "").strip() or None,
+        "is_prescription_required": (row.get("is_prescription_required") or "").lower() in TRUE_VALUES,
+        "is_active": True,
+    }
+
+def product_content_hash(values: dict) -> str:
+    """Hash the feed-owned columns the same way product_content_hash_sql does"""
+    price = Decimal(str(values["price"])).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    parts = [
+        values["name"],
+        values["description"] or "",
+        str(price),
+        str(values["stock_quantity"]),
+        str(values["category_id"]),
+        values["manufacturer"] or "",
+        values["dosage"] or "",
+        "true" if values["is_prescription_required"] else "false",
+    ]
+    return hashlib.md5("|".join(parts).encode("utf-8")).hexdigest()
+
+def product_content_hash_sql(columns):
+    """SQL twin of product_content_hash over products columns or EXCLUDED
+
+    Computed from the live row rather than stored, so edits made through the
+    admin API or stock taken by checkouts are never mistaken for unchanged.
+    """
+    return func.md5(func.concat_ws(
+        "|",
+        columns["name"],
+        func.coalesce(columns["description"], ""),
+        cast(columns["price"], Text),
+        cast(func.coalesce(columns["stock_quantity"], 0), Text),
+        func.coalesce(cast(columns["category_id"], Text), ""),
+        func.coalesce(columns["manufacturer"], ""),
+        func.coalesce(columns["dosage"], ""),
+        cast(func.coalesce(columns["is_prescription_required"], False), Text),
+    ))
+
+class ProductImporter:
+    """Imports CSV batches with one SKU lookup and one multi-row INSERT per batch
+
+    In upsert mode existing SKUs are updated instead of rejected, and rows
+    whose content hash matches the stored product are not written at all.
+    """
+
+    def __init__(self, db: AsyncSession, mode: ImportMode = ImportMode.INSERT):
+        self.db = db
+        self.mode = mode
+        self.category_map: Dict[str, int] = {}
+        self.seen_skus: Set[str] = set()
+        self.created_products: List[str] = []
+        self.updated_count = 0
+        self.unchanged_count = 0
+        self.errors: List[str] = []
+
+    async def load_categories(self):
+        """Preload every category so rows resolve their category_id from memory"""
+        result = await self.db.execute(select(Category.name, Category.id))
+        self.category_map = dict(result.all())
+
+    async def _ensure_categories(self, names: Set[str]):
+        missing = names - self.category_map.keys()
+        if not missing:
+            return
+
+        await self.db.execute(
+            insert(Category)
+            .values([
+                {"name": name, "description": f"Auto-created category: {name}", "is_active": True}
+                for name in sorted(missing)
+            ])
+            .on_conflict_do_nothing(index_elements=["name"])
+        )
+        result = await self.db.execute(select(Category.name, Category.id).where(Category.name.in_(missing)))
+        self.category_map.update(result.all())
+        await notify_catalog_change_async(self.db, "category")
+
+    def _parse_batch(self, batch: List[Tuple[int, dict]]) -> List[Tuple[int, dict]]:
+        parsed = []
+        for row_num, row in batch:
+            try:
+                values = parse_product_row(row)
+            except (ValueError, TypeError) as e:
+                self.errors.append(f"Row {row_num}: {str(e)}")
+                continue
+
+            if values["sku"] in self.seen_skus:
+                self.errors.append(f"Row {row_num}: Duplicate SKU '{values['sku']}' in file")
+                continue
+            self.seen_skus.add(values["sku"])
+            parsed.append((row_num, values))
+        return parsed
+
+    async def _prepare_batch(self, batch: List[Tuple[int, dict]]) -> List[Tuple[int, dict]]:
+        parsed = self._parse_batch(batch)
+        if not parsed or self.mode == ImportMode.UPSERT:
+            return parsed
+
+        skus = [values["sku"] for _, values in parsed]
+        existing = set(await self.db.scalars(select(Product.sku).where(Product.sku.in_(skus))))
+
+        rows = []
+        for row_num, values in parsed:
+            if values["sku"] in existing:
+                self.errors.append(f"Row {row_num}: Product with SKU '{values['sku']}' already exists")
+                continue
+            rows.append((row_num, values))
+        return rows
+
+    async def _product_rows(self, rows: List[Tuple[int, dict]]) -> List[dict]:
+        await self._ensure_categories({values["category_name"] for _, values in rows})
+
+        product_rows = []
+        for _, values in rows:
+            values = dict(values)
+            values["category_id"] = self.category_map[values.pop("category_name")]
+            product_rows.append(values)
+        return product_rows
+
+    async def _insert_rows(self, rows: List[Tuple[int, dict]]):
+        product_rows = await self._product_rows(rows)
+
+        # A SKU inserted concurrently since the lookup is skipped, not fatal
+        result = await self.db.execute(
+            insert(Product)
+            .values(product_rows)
+            .on_conflict_do_nothing(index_elements=["sku"])
+            .returning(Product.id, Product.sku)
+        )
+        inserted = dict((sku, product_id) for product_id, sku in result.all())
+
+        if inserted:
+            await notify_catalog_change_async(self.db, "product", list(inserted.values()))
+
+        for row_num, values in rows:
+            if values["sku"] in inserted:
+                self.created_products.append(values["name"])
+            else:
+                self.errors.append(f"Row {row_num}: Product with SKU '{values['sku']}' already exists")
+
+    async def _upsert_rows(self, rows: List[Tuple[int, dict]]):
+        product_rows = await self._product_rows(rows)
+        hashes = {values["sku"]: product_content_hash(values) for values in product_rows}
+
+        result = await self.db.execute(
+            select(Product.sku, product_content_hash_sql(Product.__table__.c))
+            .where(Product.sku.in_(list(hashes)))
+        )
+        stored = dict(result.all())
+
+        changed = [
+            (row_num, values) for (row_num, _), values in zip(rows, product_rows)
+            if stored.get(values["sku"]) != hashes[values["sku"]]
+        ]
+        self.unchanged_count += len(rows) - len(changed)
+        if not changed:
+            return
+
+        stmt = insert(Product).values([values for _, values in changed])
+        # The WHERE re-checks against the live row, covering edits made since the lookup
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["sku"],
+            set_={**{column: stmt.excluded[column] for column in UPSERT_COLUMNS}, "updated_at": func.now()},
+            where=product_content_hash_sql(Product.__table__.c) != product_content_hash_sql(stmt.excluded)
+        ).returning(Product.id, Product.sku, literal_column("xmax = 0"))
+        written = {sku: (product_id, inserted) for product_id, sku, inserted in (await self.db.execute(stmt)).all()}
+
+        if written:
+            await notify_catalog_change_async(self.db, "product", [product_id for product_id, _ in written.values()])
+
+        for _, values in changed:
+            if values["sku"] not in written:
+                self.unchanged_count += 1
+            elif written[values["sku"]][1]:
+                self.created_products.append(values["name"])
+            else:
+                self.updated_count += 1
+
+    async def commit_batch(self, batch: List[Tuple[int, dict]]):
+        """Commit the batch; subclasses record progress in the same transaction"""
+        await self.db.commit()
+
+    async def _write_rows(self, rows: List[Tuple[int, dict]]):
+        if self.mode == ImportMode.UPSERT:
+            await self._upsert_rows(rows)
+        else:
+            await self._insert_rows(rows)
+
+    async def _write_rows_one_by_one(self, rows: List[Tuple[int, dict]]):
+        # Isolate the bad rows so one row cannot sink the whole batch
+        for row_num, values in rows:
+            created_before, updated_before, unchanged_before = len(self.created_products), self.updated_count, self.unchanged_count
+            try:
+                async with self.db.begin_nested():
+                    await self._write_rows([(row_num, values)])
+            except Exception as e:
+                del self.created_products[created_before:]
+                self.updated_count, self.unchanged_count = updated_before, unchanged_before
+                # A category created for this row was rolled back with it
+                await self.load_categories()
+                self.errors.append(f"Row {row_num}: {str(e)}")
+
+    async def import_batch(self, batch: List[Tuple[int, dict]]):
+        """Insert or upsert one batch of rows and commit it"""
+        rows = await self._prepare_batch(batch)
+        if rows:
+            created_before, errors_before = len(self.created_products), len(self.errors)
+            updated_before, unchanged_before = self.updated_count, self.unchanged_count
+            try:
+                async with self.db.begin_nested():
+                    await self._write_rows(rows)
+            except Exception:
+                del self.created_products[created_before:]
+                del self.errors[errors_before:]
+                self.updated_count, self.unchanged_count = updated_before, unchanged_before
+                # Categories created in this batch were rolled back with it
+                await self.load_categories()
+                await self._write_rows_one_by_one(rows)
+
+        await self.commit_batch(batch)
@@ -0,0 +1,147 @@
+"""
+Sliding-window rate limiting - one atomic Redis script shared by all workers, with a per-worker fallback
+"""
+import ipaddress
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional, Tuple
+from starlette.datastructures import Headers
+from .config import settings
+from .redis_pool import RedisUnavailable, redis_client, redis_command
+
+logger = logging.getLogger(__name__)
+
+# Sliding-window log: prune entries older than the window, count, then record the
+# hit only if it is allowed. Redis TIME keeps every worker on the same clock.
+SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local member = ARGV[3]
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+if count >= limit then
+    local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+    local retry_after = window
+    if oldest[2] then
+        retry_after = tonumber(oldest[2]) + window - now
+    end
+    return {0, count, retry_after}
+end
+
+redis.call('ZADD', key, now, member)
+redis.call('PEXPIRE', key, window)
+return {1, count + 1, 0}
+"""
+
+_TRUSTED_PROXIES = tuple(ipaddress.ip_network(proxy, strict=False) for proxy in settings.TRUSTED_PROXY_IPS)
+
+def client_ip(scope) -> Optional[str]:
+    """The client address to rate limit by, or None when it cannot be trusted
+
+    Requests relayed by a trusted proxy are attributed to its X-Real-IP;
+    anything else connected directly, so the peer address is the client's.
+    """
+    if not _TRUSTED_PROXIES:
+        return None
+    client = scope.get("client")
+    if not client:
+        return None
+    try:
+        peer = ipaddress.ip_address(client[0])
+    except ValueError:
+        return None
+    if any(peer in network for network in _TRUSTED_PROXIES):
+        return Headers(scope=scope).get("x-real-ip")
+    return client[0]
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float  # Seconds until the next hit would be allowed
+    member: Optional[str] = field(default=None, compare=False)  # The recorded hit in Redis, for refund()
+
+    @property
+    def headers(self) -> dict:
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining)
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(int(self.retry_after + 0.999), 1))
+        return headers
+
+class RateLimiter:
+    """Exact shared limits through Redis; token buckets per worker while Redis is unavailable
+
+    The fallback keeps each worker under the limit on its own, so across workers
+    the effective limit is up to the number of workers times higher until Redis
+    is back. An open Redis breaker makes the fallback immediate.
+    """
+
+    def __init__(self):
+        # EVALSHA, reloading the script if Redis was restarted
+        self._script = redis_client.register_script(SLIDING_WINDOW_SCRIPT)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def hit(self, key: str, limit: int, window_seconds: float) -> RateLimitResult:
+        """Record one hit against key and report whether it is within limit per window"""
+        member = uuid.uuid4().hex
+        try:
+            allowed, count, retry_after_ms = await redis_command(lambda client: self._script(
+                keys=[f"ratelimit:{key}"],
+                args=[limit, int(window_seconds * 1000), member],
+                client=client
+            ))
+        except RedisUnavailable as e:
+            logger.debug(f"Rate limiter using local buckets: {e}")
+            return self._local_hit(key, limit, window_seconds)
+        return RateLimitResult(
+            bool(allowed), limit, max(limit - int(count), 0), int(retry_after_ms) / 1000,
+            member if allowed else None
+        )
+
+    async def refund(self, key: str, result: RateLimitResult):
+        """Take back one allowed hit, e.g. a login that turned out to succeed
+
+        Only that hit is removed; every other hit in the window still counts,
+        so a success never clears failures recorded against a shared key.
+        """
+        if not result.allowed:
+            return
+        if result.member is None:
+            tokens, updated = self._buckets.get(key, (None, None))
+            if tokens is not None:
+                self._buckets[key] = (min(tokens + 1, float(result.limit)), updated)
+            return
+        try:
+            await redis_command(lambda client: client.zrem(f"ratelimit:{key}", result.member))
+        except RedisUnavailable as e:
+            logger.warning(f"Rate limiter refund failed: {e}")
+
+    def _local_hit(self, key: str, limit: int, window_seconds: float) -> RateLimitResult:
+        # Token bucket refilling the full limit once per window
+        rate = limit / window_seconds
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (float(limit), now))
+        tokens = min(float(limit), tokens + (now - updated) * rate)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > settings.RATE_LIMIT_LOCAL_MAX_KEYS:
+            self._buckets.popitem(last=False)
+
+        retry_after = 0.0 if allowed else (1 - tokens) / rate
+        return RateLimitResult(allowed, limit, int(tokens), retry_after)
+
+rate_limiter = RateLimiter()
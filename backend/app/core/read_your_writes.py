@@ -0,0 +1,54 @@
+"""
+Read-your-writes for replica reads - a user who just wrote is pinned to the primary through Redis, in every worker
+"""
+import logging
+from typing import Optional
+from fastapi import Request
+from .config import settings
+from .redis_pool import RedisUnavailable, redis_command
+from .security import verify_token
+
+logger = logging.getLogger(__name__)
+
+def _replica_enabled() -> bool:
+    return settings.DATABASE_REPLICA_URL != settings.DATABASE_URL
+
+def _pin_key(subject: str) -> str:
+    return f"primary_reads:{subject}"
+
+def request_subject(request: Request) -> Optional[str]:
+    """The access token subject of the request, if it carries a valid bearer token"""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = verify_token(token)
+    if not payload or not payload.get("sub"):
+        return None
+    return str(payload["sub"])
+
+async def pin_reads_to_primary(subject: str):
+    """Send the subject's reads to the primary until the replicas have caught up"""
+    if not _replica_enabled():
+        return
+    try:
+        await redis_command(lambda client: client.set(_pin_key(subject), 1, ex=settings.READ_YOUR_WRITES_SECONDS))
+    except RedisUnavailable as e:
+        # Reads fall back to the primary while Redis is unavailable anyway
+        logger.warning(f"Failed to pin reads of {subject} to the primary: {e}")
+
+async def reads_from_primary(request: Request) -> bool:
+    """True while the caller is inside its read-your-writes window
+
+    Anonymous requests always read from the replica. When Redis cannot
+    answer, authenticated reads go to the primary rather than risk missing
+    the caller's own write.
+    """
+    if not _replica_enabled():
+        return False
+    subject = request_subject(request)
+    if subject is None:
+        return False
+    try:
+        return bool(await redis_command(lambda client: client.exists(_pin_key(subject))))
+    except RedisUnavailable:
+        return True
@@ -0,0 +1,100 @@
+"""
+Shared redis.asyncio connection pool behind a circuit breaker
+"""
+import time
+from typing import Any, Awaitable, Callable, Optional
+import redis.asyncio as aioredis
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError as RedisConnectionError, RedisError, TimeoutError as RedisTimeoutError
+from .config import settings
+
+class RedisUnavailable(Exception):
+    """Redis could not serve the command, or the breaker is open and it was not tried"""
+
+class CircuitBreaker:
+    """Fails fast after consecutive connection errors; lets one trial call through after a cool-down"""
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_seconds:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open" or self._trial_in_flight:
+            return False
+        self._trial_in_flight = True
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.failures >= self.failure_threshold:
+            # Re-arming on a failed trial restarts the cool-down
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """End a trial that neither succeeded nor failed, e.g. a cancelled request"""
+        self._trial_in_flight = False
+
+redis_pool = aioredis.ConnectionPool.from_url(
+    settings.REDIS_URL,
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+    socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+    socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+    health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL_SECONDS,
+    retry=Retry(ExponentialBackoff(cap=0.1, base=0.01), settings.REDIS_RETRIES),
+    retry_on_error=[RedisConnectionError, RedisTimeoutError],
+    decode_responses=True
+)
+redis_client = aioredis.Redis(connection_pool=redis_pool)
+redis_breaker = CircuitBreaker(settings.REDIS_BREAKER_FAILURE_THRESHOLD, settings.REDIS_BREAKER_RESET_SECONDS)
+
+async def redis_command(operation: Callable[[aioredis.Redis], Awaitable[Any]]) -> Any:
+    """Run operation(redis_client) through the breaker, raising RedisUnavailable on any Redis error"""
+    if not redis_breaker.allow():
+        raise RedisUnavailable("circuit open")
+    try:
+        result = await operation(redis_client)
+    except (RedisConnectionError, RedisTimeoutError, OSError) as e:
+        redis_breaker.record_failure()
+        raise RedisUnavailable(str(e)) from e
+    except RedisError as e:
+        # Redis answered, so it is up; the command itself was wrong
+        redis_breaker.record_success()
+        raise RedisUnavailable(str(e)) from e
+    except BaseException:
+        redis_breaker.release()
+        raise
+    redis_breaker.record_success()
+    return result
+
+def redis_stats() -> dict:
+    return {
+        "breaker": redis_breaker.state,
+        "consecutive_failures": redis_breaker.failures,
+        "connections_in_use": len(redis_pool._in_use_connections),
+        "connections_idle": len(redis_pool._available_connections),
+        "max_connections": redis_pool.max_connections
+    }
+
+async def close_redis():
+    await redis_pool.disconnect()
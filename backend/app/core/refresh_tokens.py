@@ -0,0 +1,93 @@
+"""
+Access/refresh token pairs - refresh tokens rotate on every use and a replayed one revokes its whole family
+"""
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException, status
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from .config import settings
+from .principals import Principal
+from .security import create_access_token, create_refresh_token, verify_token
+from ..models.refresh_token import RefreshToken
+from ..models.user import User
+
+logger = logging.getLogger(__name__)
+
+def _invalid_refresh_token(detail: str = "Invalid refresh token") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail
+    )
+
+def _add_token_pair(db: AsyncSession, user: User, family_id: str) -> dict:
+    token_id = uuid.uuid4().hex
+    expires_at = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    db.add(RefreshToken(id=token_id, family_id=family_id, user_id=user.id, expires_at=expires_at))
+    return {
+        "access_token": create_access_token(data=Principal.from_user(user).claims()),
+        "refresh_token": create_refresh_token(user.id, token_id, family_id, expires_at),
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    }
+
+async def issue_token_pair(db: AsyncSession, user: User) -> dict:
+    """Start a new refresh token family for a fresh login"""
+    tokens = _add_token_pair(db, user, uuid.uuid4().hex)
+    await db.commit()
+    return tokens
+
+async def _revoke_family(db: AsyncSession, family_id: str):
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=func.now())
+    )
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> dict:
+    """Exchange a refresh token for a new pair, re-reading the user so role changes apply"""
+    payload = verify_token(token, "refresh")
+    if payload is None or not payload.get("jti"):
+        raise _invalid_refresh_token()
+
+    # The row lock serialises concurrent refreshes of the same token
+    stored = await db.scalar(
+        select(RefreshToken).where(RefreshToken.id == payload["jti"]).with_for_update()
+    )
+    if stored is None or stored.revoked_at is not None:
+        raise _invalid_refresh_token()
+
+    if stored.used_at is not None:
+        # Only one holder can have seen the successor token, so the other copy is stolen
+        logger.warning(f"Refresh token reuse for user {stored.user_id}; revoking family {stored.family_id}")
+        await _revoke_family(db, stored.family_id)
+        await db.commit()
+        raise _invalid_refresh_token("Refresh token reuse detected")
+
+    user = await db.get(User, stored.user_id)
+    if user is None or not user.is_active:
+        await _revoke_family(db, stored.family_id)
+        await db.commit()
+        raise _invalid_refresh_token("Account is inactive")
+
+    stored.used_at = func.now()
+    tokens = _add_token_pair(db, user, stored.family_id)
+    await db.commit()
+    return tokens
+
+async def revoke_refresh_token(db: AsyncSession, token: str):
+    """Revoke the family of a refresh token on logout; unknown or invalid tokens are ignored"""
+    payload = verify_token(token, "refresh")
+    if payload is None or not payload.get("fam"):
+        return
+    await _revoke_family(db, payload["fam"])
+    await db.commit()
+
+async def revoke_user_refresh_tokens(db: AsyncSession, user_id: int):
+    """Revoke every refresh token of a user; takes effect when the caller commits"""
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=func.now())
+    )
@@ -0,0 +1,121 @@
+"""
+Revoked token IDs held in every worker, kept in sync through Redis pub/sub and a periodic full resync
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+from .config import settings
+from .redis_pool import RedisUnavailable, redis_client, redis_command
+
+logger = logging.getLogger(__name__)
+
+REVOKED_TOKENS_KEY = "revoked_tokens"  # Sorted set: jti scored by token expiry
+REVOCATION_CHANNEL = "token_revocations"
+
+def record_revocation(pipe, jti: str, expires_at: float):
+    """Queue the revocation on a sync or async Redis pipeline; the set is written before the publish"""
+    pipe.zadd(REVOKED_TOKENS_KEY, {jti: expires_at})
+    pipe.publish(REVOCATION_CHANNEL, f"{jti}:{expires_at}")
+
+class RevocationFilter:
+    """Exact set of revoked, unexpired JTIs; checking a token never leaves the process
+
+    Revocations are rare and only matter until the token expires, so the set
+    stays small. If Redis is unreachable the set goes stale rather than
+    failing requests; the next resync catches up.
+    """
+
+    def __init__(self):
+        self._revoked: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.synced_at: Optional[float] = None
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        if not jti:
+            return False
+        expires_at = self._revoked.get(jti)
+        if expires_at is None:
+            return False
+        if expires_at < time.time():
+            # The token has expired on its own; signature checks reject it from here on
+            self._revoked.pop(jti, None)
+            return False
+        return True
+
+    def add(self, jti: str, expires_at: float):
+        if expires_at > time.time():
+            self._revoked[jti] = expires_at
+
+    async def revoke(self, jti: str, expires_at: float):
+        """Revoke a token in every worker until it expires"""
+        self.add(jti, expires_at)
+        try:
+            await redis_command(lambda client: self._publish(client, jti, expires_at))
+        except RedisUnavailable as e:
+            logger.warning(f"Failed to publish revocation of {jti}; only this worker knows: {e}")
+
+    @staticmethod
+    async def _publish(client, jti: str, expires_at: float):
+        async with client.pipeline(transaction=True) as pipe:
+            record_revocation(pipe, jti, expires_at)
+            await pipe.execute()
+
+    async def resync(self):
+        """Replace the local set with the authoritative one in Redis"""
+        now = time.time()
+        await redis_command(lambda client: client.zremrangebyscore(REVOKED_TOKENS_KEY, "-inf", now))
+        entries = await redis_command(lambda client: client.zrangebyscore(REVOKED_TOKENS_KEY, now, "+inf", withscores=True))
+        self._revoked = {jti: expires_at for jti, expires_at in entries}
+        self.synced_at = now
+
+    def _apply_message(self, data: str):
+        jti, _, expires_at = data.rpartition(":")
+        try:
+            self.add(jti, float(expires_at))
+        except ValueError:
+            logger.warning(f"Ignoring malformed revocation message: {data}")
+
+    def stats(self) -> dict:
+        return {
+            "revoked": len(self._revoked),
+            "synced_seconds_ago": round(time.time() - self.synced_at, 1) if self.synced_at else None
+        }
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                # Pub/sub holds its own pool connection for as long as it is subscribed
+                async with redis_client.pubsub() as pubsub:
+                    # Subscribe before the resync so nothing published in between is missed
+                    await pubsub.subscribe(REVOCATION_CHANNEL)
+                    await self.resync()
+                    next_resync = loop.time() + settings.TOKEN_REVOCATION_RESYNC_SECONDS
+                    while True:
+                        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                        if message is not None:
+                            self._apply_message(message["data"])
+                        if loop.time() >= next_resync:
+                            await self.resync()
+                            next_resync = loop.time() + settings.TOKEN_REVOCATION_RESYNC_SECONDS
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Token revocation sync error: {e}")
+                await asyncio.sleep(5)
+
+revocation_filter = RevocationFilter()
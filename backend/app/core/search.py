@@ -0,0 +1,24 @@
+"""
+Product search - Postgres full-text search with pg_trgm fallback for typos
+"""
+from sqlalchemy import func, or_
+from ..models.product import Product
+
+SEARCH_CONFIG = "english"
+
+def search_products(query, term: str):
+    """Filter a Product query by search term and order it by relevance"""
+    term = term.strip()
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, term)
+    similarity = func.similarity(Product.name, term)
+
+    # Full-text matches use the GIN index on search_vector; the trigram
+    # operator on name (pg_trgm.similarity_threshold, default 0.3) catches
+    # misspellings the stemmer cannot
+    query = query.filter(or_(
+        Product.search_vector.op("@@")(ts_query),
+        Product.name.op("%")(term)
+    ))
+
+    rank = func.ts_rank_cd(Product.search_vector, ts_query) + similarity
+    return query.order_by(rank.desc(), Product.id)
@@ -2,12 +2,10 @@ from datetime import datetime, timedelta
 from typing import Optional
 import hashlib
 import secrets
+import uuid
 from jose import JWTError, jwt
 from .config import settings
 
-# Session timeout: 1 hour
-SESSION_TIMEOUT_MINUTES = 60
-
 # Use PBKDF2 with SHA256 for secure password hashing (Docker compatible)
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash (supports both bcrypt and PBKDF2)"""
@@ -33,11 +31,13 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     except Exception:
         return False
 
+PBKDF2_ITERATIONS = 100000  # OWASP recommended minimum
+
 def get_password_hash(password: str) -> str:
     """Hash a password using PBKDF2-SHA256"""
     # Generate a random salt
     salt = secrets.token_bytes(32)
-    iterations = 100000  # OWASP recommended minimum
+    iterations = PBKDF2_ITERATIONS
     
     # Hash the password
     password_hash = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, iterations)
@@ -45,21 +45,47 @@ def get_password_hash(password: str) -> str:
     # Return in format: algorithm$iterations$salt_hex+hash_hex
     return f"pbkdf2_sha256${iterations}${salt.hex()}{password_hash.hex()}"
 
+def needs_rehash(hashed_password: str) -> bool:
+    """True for legacy bcrypt hashes and PBKDF2 hashes below the current work factor"""
+    parts = hashed_password.split('$')
+    if len(parts) == 3 and parts[0] == 'pbkdf2_sha256':
+        try:
+            return int(parts[1]) < PBKDF2_ITERATIONS
+        except ValueError:
+            return True
+    return True
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    """Create a JWT access token"""
+    """Create a short-lived JWT access token"""
     to_encode = data.copy()
+    now = datetime.utcnow()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=SESSION_TIMEOUT_MINUTES)
+        expire = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": now, "type": "access", "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def verify_token(token: str):
+def create_refresh_token(user_id: int, token_id: str, family_id: str, expires_at: datetime):
+    """Create a refresh token; its jti must match a refresh_tokens row to be accepted"""
+    to_encode = {
+        "sub": str(user_id),
+        "type": "refresh",
+        "jti": token_id,
+        "fam": family_id,
+        "exp": expires_at,
+        "iat": datetime.utcnow()
+    }
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+def verify_token(token: str, token_type: str = "access"):
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+    # Access tokens issued before token types were introduced carry no "type"
+    if payload.get("type", "access") != token_type:
+        return None
+    return payload
\ No newline at end of file
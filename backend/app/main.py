@@ -1,13 +1,27 @@
-from fastapi import FastAPI, Request, Response
+from fastapi import Depends, FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.base import BaseHTTPMiddleware
 from .core.config import settings
-from .core.database import engine, Base
+from .core.database import engine, async_engine, replica_engine, async_replica_engine, Base
+from .core.db_pool import pool_stats
+from .core.deps import get_metrics_access
+from .core.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, TOTAL_ESTIMATED_HEADER
+from .core.audit import audit_writer
+from .core.audit_partitions import audit_retention_job
+from .core.password_hashing import password_hasher
+from .core.redis_pool import close_redis, redis_stats
+from .core.read_your_writes import pin_reads_to_primary, request_subject
+from .core.load_shedding import LoadSheddingMiddleware, load_shedder, loop_lag_monitor
+from .core.revocation import revocation_filter
+from .core.cache import invalidation_listener
+from .core.dashboard_metrics import dashboard_metrics_refresher
+from .core.import_jobs import import_job_worker
 from .api.v1 import auth, products, cart, orders, admin, upload
-from .api.v1 import products_admin
+from .api.v1 import products_admin, exports
 import logging
+import os
 
 logging.basicConfig(level=logging.DEBUG)
 logging.getLogger('fastapi_mail').setLevel(logging.DEBUG)
@@ -23,6 +37,19 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
         response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
         return response
 
+# Read-your-writes: after a successful write, pin the user's reads to the
+# primary until the replicas have had time to catch up. Keyed on the token
+# subject, so it works for every client that sends the bearer token.
+class ReadYourWritesMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+            subject = request_subject(request)
+            if subject is not None:
+                # Pinned before the response is sent, so the client's next read sees it
+                await pin_reads_to_primary(subject)
+        return response
+
 # Create tables
 Base.metadata.create_all(bind=engine)
 
@@ -35,12 +62,17 @@ app = FastAPI(
 )
 
 # Middleware
+# Added first so it runs innermost: CORS headers still reach 429/503 responses,
+# and it still runs before routing opens any DB session
+app.add_middleware(LoadSheddingMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_HOSTS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, TOTAL_ESTIMATED_HEADER, "ETag", "Content-Disposition", "Retry-After", "X-RateLimit-Limit", "X-RateLimit-Remaining"],
 )
 
 app.add_middleware(
@@ -49,6 +81,7 @@ app.add_middleware(
 )
 
 app.add_middleware(SecurityHeadersMiddleware)
+app.add_middleware(ReadYourWritesMiddleware)
 
 # Include routers
 app.include_router(auth.router, prefix="/api/v1")
@@ -58,6 +91,79 @@ app.include_router(orders.router, prefix="/api/v1")
 app.include_router(admin.router, prefix="/api/v1")
 app.include_router(upload.router, prefix="/api/v1")
 app.include_router(products_admin.router, prefix="/api/v1")
+app.include_router(exports.router, prefix="/api/v1")
+
+@app.on_event("startup")
+async def start_loop_lag_monitor():
+    loop_lag_monitor.start()
+
+@app.on_event("shutdown")
+async def stop_loop_lag_monitor():
+    await loop_lag_monitor.stop()
+
+@app.on_event("startup")
+async def start_revocation_filter():
+    revocation_filter.start()
+
+@app.on_event("shutdown")
+async def stop_revocation_filter():
+    await revocation_filter.stop()
+
+@app.on_event("startup")
+def start_invalidation_listener():
+    invalidation_listener.start()
+
+@app.on_event("shutdown")
+def stop_invalidation_listener():
+    invalidation_listener.stop()
+
+@app.on_event("startup")
+async def start_dashboard_metrics_refresher():
+    dashboard_metrics_refresher.start()
+
+@app.on_event("shutdown")
+async def stop_dashboard_metrics_refresher():
+    await dashboard_metrics_refresher.stop()
+
+@app.on_event("startup")
+async def start_import_job_worker():
+    import_job_worker.start()
+
+@app.on_event("shutdown")
+async def stop_import_job_worker():
+    await import_job_worker.stop()
+
+@app.on_event("startup")
+async def start_audit_writer():
+    audit_writer.start()
+
+@app.on_event("startup")
+async def start_audit_retention_job():
+    # The first pass also creates the current month's partition on a fresh database
+    audit_retention_job.start()
+
+@app.on_event("shutdown")
+async def stop_audit_retention_job():
+    await audit_retention_job.stop()
+
+@app.on_event("shutdown")
+async def stop_audit_writer():
+    # Flush queued events before the engines are disposed
+    await audit_writer.stop()
+
+@app.on_event("shutdown")
+def stop_password_hasher():
+    password_hasher.shutdown()
+
+@app.on_event("shutdown")
+async def close_redis_pool():
+    await close_redis()
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await async_engine.dispose()
+    if async_replica_engine is not async_engine:
+        await async_replica_engine.dispose()
 
 # Mount static files
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
@@ -75,6 +181,47 @@ def root():
 def health_check():
     return {"status": "healthy"}
 
+# Worker internals; only for METRICS_ALLOWED_IPS or admin tokens, since the
+# backend port is published and reachable through nginx
+@app.get("/metrics/db-pool", dependencies=[Depends(get_metrics_access)])
+def db_pool_metrics():
+    """Connection pool stats for this worker"""
+    stats = {
+        "pid": os.getpid(),
+        "sync": pool_stats(engine),
+        "async": pool_stats(async_engine.sync_engine)
+    }
+    # The replica pools only exist when DATABASE_REPLICA_URL names another database
+    if replica_engine is not engine:
+        stats["sync_replica"] = pool_stats(replica_engine)
+        stats["async_replica"] = pool_stats(async_replica_engine.sync_engine)
+    return stats
+
+@app.get("/metrics/audit-queue", dependencies=[Depends(get_metrics_access)])
+def audit_queue_metrics():
+    """Audit writer queue depth for this worker"""
+    return {"pid": os.getpid(), **audit_writer.stats()}
+
+@app.get("/metrics/password-hashing", dependencies=[Depends(get_metrics_access)])
+def password_hashing_metrics():
+    """Password hashing pool queue depth for this worker"""
+    return {"pid": os.getpid(), **password_hasher.stats()}
+
+@app.get("/metrics/load-shedding", dependencies=[Depends(get_metrics_access)])
+def load_shedding_metrics():
+    """In-flight requests, event-loop lag and rejected request counts for this worker"""
+    return {"pid": os.getpid(), **load_shedder.stats()}
+
+@app.get("/metrics/redis", dependencies=[Depends(get_metrics_access)])
+def redis_metrics():
+    """Redis circuit breaker state and connection pool usage for this worker"""
+    return {"pid": os.getpid(), **redis_stats()}
+
+@app.get("/metrics/token-revocation", dependencies=[Depends(get_metrics_access)])
+def token_revocation_metrics():
+    """Size and freshness of this worker's revoked-token set"""
+    return {"pid": os.getpid(), **revocation_filter.stats()}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
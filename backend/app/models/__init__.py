@@ -4,6 +4,10 @@ from .order import Order, OrderItem
 from .cart import Cart, CartItem
 from .audit_log import AuditLog
 from .product_image import ProductImage
+from .idempotency_key import IdempotencyKey
+from .dashboard_metrics import DashboardMetrics
+from .import_job import ImportJob
+from .refresh_token import RefreshToken
 from ..core.database import Base
 
-__all__ = ["User", "Product", "Category", "Order", "OrderItem", "Cart", "CartItem", "AuditLog", "ProductImage", "Base"]
\ No newline at end of file
+__all__ = ["User", "Product", "Category", "Order", "OrderItem", "Cart", "CartItem", "AuditLog", "ProductImage", "IdempotencyKey", "DashboardMetrics", "ImportJob", "RefreshToken", "Base"]
\ No newline at end of file
@@ -1,21 +1,31 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..core.database import Base
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        Index("ix_audit_logs_timestamp_id", "timestamp", "id"),
+        Index("ix_audit_logs_entity_type_entity_id", "entity_type", "entity_id"),
+        Index("ix_audit_logs_user_id_timestamp", "user_id", "timestamp"),
+        Index("ix_audit_logs_changes", "changes", postgresql_using="gin"),
+        # Monthly range partitions are created and dropped by core.audit_partitions
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(BigInteger, primary_key=True, autoincrement=True, index=True)
     action = Column(String, nullable=False)  # CREATE, UPDATE, DELETE, LOGIN, LOGOUT
     entity_type = Column(String, nullable=False)  # USER, PRODUCT, ORDER, etc.
     entity_id = Column(Integer, nullable=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # None for system events
     user_name = Column(String, nullable=False)
     ip_address = Column(String, nullable=True)
     user_agent = Column(String, nullable=True)
-    changes = Column(JSON, nullable=True)  # Store what changed
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    changes = Column(JSONB, nullable=True)  # Store what changed
+    # Partition key, so part of the primary key
+    timestamp = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
     
     # Relationships
     user = relationship("User")
\ No newline at end of file
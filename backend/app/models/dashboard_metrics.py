@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, DateTime
+from sqlalchemy.types import DECIMAL
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+class DashboardMetrics(Base):
+    """Single-row snapshot of admin dashboard counters, refreshed in the background"""
+    __tablename__ = "dashboard_metrics"
+    
+    id = Column(Integer, primary_key=True)
+    total_products = Column(Integer, nullable=False, default=0)
+    low_stock_products = Column(Integer, nullable=False, default=0)
+    total_categories = Column(Integer, nullable=False, default=0)
+    total_users = Column(Integer, nullable=False, default=0)
+    active_users = Column(Integer, nullable=False, default=0)
+    admin_users = Column(Integer, nullable=False, default=0)
+    total_orders = Column(Integer, nullable=False, default=0)
+    pending_orders = Column(Integer, nullable=False, default=0)
+    total_revenue = Column(DECIMAL(14, 2), nullable=False, default=0)
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,46 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Text, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+import enum
+from ..core.database import Base
+
+class ImportJobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class ImportMode(str, enum.Enum):
+    INSERT = "insert"  # Reject rows whose SKU already exists
+    UPSERT = "upsert"  # Update existing SKUs, skipping unchanged rows
+
+class ImportJob(Base):
+    """Background bulk import; progress is committed together with each batch"""
+    __tablename__ = "import_jobs"
+    __table_args__ = (
+        Index("ix_import_jobs_status_heartbeat_at", "status", "heartbeat_at"),
+    )
+    
+    id = Column(String(32), primary_key=True)
+    kind = Column(String, nullable=False, default="products")
+    mode = Column(Enum(ImportMode), nullable=False, default=ImportMode.INSERT)
+    status = Column(Enum(ImportJobStatus), nullable=False, default=ImportJobStatus.QUEUED)
+    filename = Column(String, nullable=False)
+    file_path = Column(String, nullable=False)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    total_rows = Column(Integer, nullable=True)
+    rows_processed = Column(Integer, nullable=False, default=0)
+    created_count = Column(Integer, nullable=False, default=0)
+    updated_count = Column(Integer, nullable=False, default=0)
+    unchanged_count = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    errors = Column(JSONB, nullable=False, default=list)  # Capped at IMPORT_JOB_MAX_STORED_ERRORS
+    last_committed_row = Column(Integer, nullable=False, default=0)  # Resume point
+    failure_reason = Column(Text, nullable=True)
+    worker_id = Column(String, nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    run_started_at = Column(DateTime(timezone=True), nullable=True)
+    run_start_rows = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index, Computed, Sequence
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.types import DECIMAL
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from pydantic import BaseModel
 from typing import Optional
 from ..core.database import Base
@@ -19,8 +20,25 @@ class Category(Base):
     # Relationships
     products = relationship("Product", back_populates="category")
 
+# Bumped after every committed catalog change; used to build HTTP ETags
+catalog_version_seq = Sequence("catalog_version_seq", metadata=Base.metadata)
+
+# Weighted search document; keep in sync with the add_product_search migration
+PRODUCT_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(sku, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(manufacturer, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(dosage, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'D')"
+)
+
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        Index("ix_products_name_id", "name", "id"),
+        Index("ix_products_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_products_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True, nullable=False)
@@ -36,6 +54,7 @@ class Product(Base):
     dosage = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    search_vector = deferred(Column(TSVECTOR, Computed(PRODUCT_SEARCH_VECTOR, persisted=True)))
     
     # Relationships
     category = relationship("Category", back_populates="products")
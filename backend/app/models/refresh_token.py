@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from ..core.database import Base
+
+class RefreshToken(Base):
+    """One issued refresh token; rotation marks it used and adds the next one to the same family"""
+    __tablename__ = "refresh_tokens"
+    
+    id = Column(String(32), primary_key=True)  # The token's jti
+    family_id = Column(String(32), nullable=False, index=True)  # Shared by every rotation of one login
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    used_at = Column(DateTime(timezone=True), nullable=True)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -13,6 +13,9 @@ class UserRole(str, enum.Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
@@ -33,4 +36,12 @@ class User(Base):
     
     # Relationships
     orders = relationship("Order", back_populates="user")
-    cart = relationship("Cart", back_populates="user", uselist=False)
\ No newline at end of file
+    cart = relationship("Cart", back_populates="user", uselist=False)
+
+# Case-insensitive prefix search for the admin user list (lower(col) LIKE 'term%')
+for _column in (User.email, User.username, User.full_name):
+    Index(
+        f"ix_users_{_column.key}_prefix",
+        func.lower(_column).label(f"{_column.key}_lower"),
+        postgresql_ops={f"{_column.key}_lower": "text_pattern_ops"}
+    )
\ No newline at end of file
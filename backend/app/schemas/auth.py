@@ -9,3 +9,6 @@ class ForgotPasswordRequest(BaseModel):
 class ResetPasswordRequest(BaseModel):
     token: str
     password: str
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from decimal import Decimal
 from datetime import datetime
 from ..models.order import OrderStatus
@@ -29,7 +29,7 @@ class OrderResponse(OrderBase):
     status: OrderStatus
     payment_status: str
     created_at: datetime
-    updated_at: datetime
+    updated_at: Optional[datetime] = None
     items: List[OrderItemResponse]
     
     class Config:
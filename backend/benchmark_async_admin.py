@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark admin endpoint latency under concurrent load
+
+Usage: ADMIN_TOKEN=... python benchmark_async_admin.py [base_url] [concurrency] [seconds]
+
+Hammers the admin routes with concurrent clients while probing /health.
+When async routes block the event loop on database calls, /health latency
+on the same worker climbs with the admin load; with AsyncSession it stays flat.
+Run it against a single worker (uvicorn without --workers) before and after.
+"""
+import asyncio
+import os
+import sys
+import time
+import httpx
+
+ADMIN_PATHS = [
+    "/api/v1/admin/dashboard",
+    "/api/v1/admin/users?limit=50",
+    "/api/v1/admin/audits?limit=50",
+]
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+async def load_worker(client, headers, deadline, timings):
+    i = 0
+    while time.perf_counter() < deadline:
+        path = ADMIN_PATHS[i % len(ADMIN_PATHS)]
+        start = time.perf_counter()
+        await client.get(path, headers=headers)
+        timings.append((time.perf_counter() - start) * 1000)
+        i += 1
+
+async def health_probe(client, deadline, timings):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await client.get("/health")
+        timings.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.05)
+
+async def main():
+    base_url = sys.argv[1] if len(sys.argv) > 1 else "http://localhost:8000"
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 20
+    headers = {"Authorization": f"Bearer {os.environ['ADMIN_TOKEN']}"}
+
+    admin_timings, health_timings = [], []
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(
+            health_probe(client, deadline, health_timings),
+            *[load_worker(client, headers, deadline, admin_timings) for _ in range(concurrency)]
+        )
+
+    print(f"concurrency={concurrency} duration={seconds}s")
+    print(f"admin  requests={len(admin_timings):>6} rps={len(admin_timings) / seconds:>8.1f} "
+          f"p50={percentile(admin_timings, 50):.1f}ms p95={percentile(admin_timings, 95):.1f}ms p99={percentile(admin_timings, 99):.1f}ms")
+    print(f"health requests={len(health_timings):>6} "
+          f"p50={percentile(health_timings, 50):.1f}ms p95={percentile(health_timings, 95):.1f}ms p99={percentile(health_timings, 99):.1f}ms")
+
+if __name__ == "__main__":
+    asyncio.run(main())
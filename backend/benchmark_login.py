@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark login throughput per core
+
+Usage: LOGIN_EMAIL=... LOGIN_PASSWORD=... python benchmark_login.py [base_url] [concurrency] [seconds] [server_cores]
+
+Drives concurrent logins for a fixed time and reports logins/sec, logins/sec
+per server core and latency percentiles, while probing /health to show
+whether hashing still starves unrelated requests. Also measures raw PBKDF2
+hashes/sec on one local core as the ceiling for comparison. 503 responses
+(hashing pool saturated) are counted separately from failures.
+
+Every worker logs in as the same user from the same address, so the login
+rate limiter would otherwise dominate the result: start the server with
+LOGIN_RATE_LIMIT above the concurrency (e.g. LOGIN_RATE_LIMIT=100000). 429
+responses are reported separately and left out of the latency percentiles.
+"""
+import asyncio
+import os
+import sys
+import time
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.security import get_password_hash, verify_password
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def local_hashes_per_second(seconds: float = 3.0) -> float:
+    hashed = get_password_hash("benchmark-password")
+    count = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        verify_password("benchmark-password", hashed)
+        count += 1
+    return count / seconds
+
+async def login_worker(client, credentials, deadline, timings, statuses):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.post("/api/v1/auth/login", json=credentials)
+        elapsed = (time.perf_counter() - start) * 1000
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        # Rate-limited attempts never reach the hasher
+        if response.status_code != 429:
+            timings.append(elapsed)
+
+async def health_probe(client, deadline, timings):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await client.get("/health")
+        timings.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.05)
+
+async def main():
+    base_url = sys.argv[1] if len(sys.argv) > 1 else "http://localhost:8000"
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 20
+    server_cores = int(sys.argv[4]) if len(sys.argv) > 4 else os.cpu_count()
+    credentials = {"email": os.environ["LOGIN_EMAIL"], "password": os.environ["LOGIN_PASSWORD"]}
+
+    print(f"Local PBKDF2 verify: {local_hashes_per_second():.1f}/s on one core")
+
+    login_timings, health_timings, statuses = [], [], {}
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(
+            health_probe(client, deadline, health_timings),
+            *[login_worker(client, credentials, deadline, login_timings, statuses) for _ in range(concurrency)]
+        )
+
+    succeeded = statuses.get(200, 0)
+    rate_limited = statuses.get(429, 0)
+    print(f"Logins: {sum(statuses.values())} in {seconds:.0f}s, status counts {statuses}")
+    if rate_limited:
+        print(f"WARNING: {rate_limited} attempts were rate limited (429); raise LOGIN_RATE_LIMIT on the server")
+    print(f"Successful logins/sec: {succeeded / seconds:.1f} ({succeeded / seconds / server_cores:.1f} per core, {server_cores} cores)")
+    print(f"Login latency p50 {percentile(login_timings, 50):.1f}ms p95 {percentile(login_timings, 95):.1f}ms p99 {percentile(login_timings, 99):.1f}ms")
+    print(f"/health latency p50 {percentile(health_timings, 50):.1f}ms p95 {percentile(health_timings, 95):.1f}ms p99 {percentile(health_timings, 99):.1f}ms")
+
+if __name__ == "__main__":
+    asyncio.run(main())
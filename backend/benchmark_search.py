@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark product search against a generated catalog
+
+Usage: BENCH_DATABASE_URL=postgresql://... python benchmark_search.py --i-know-this-truncates [rows]
+
+Loads a synthetic catalog (1M products by default) into a scratch
+database and compares the legacy ILIKE scan with the ranked full-text
+and trigram search used by GET /products.
+
+The catalog is loaded with TRUNCATE ... CASCADE, which also empties
+orders, carts and product images. It only runs against BENCH_DATABASE_URL,
+never against the application's DATABASE_URL.
+"""
+import argparse
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.core.database import Base
+from app.core.search import search_products
+from app.models.product import Product
+
+TERMS = ["ibuprofen", "vitamin d3", "amoxicilin", "PharmaCorp", "SKU-0004242", "500mg tablets"]
+RUNS = 20
+
+def generate_catalog(db, rows: int):
+    """Fill the products table with synthetic rows using generate_series"""
+    print(f"Generating {rows:,} products...")
+    db.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    db.execute(text("TRUNCATE products, categories RESTART IDENTITY CASCADE"))
+    db.execute(text("INSERT INTO categories (name, description, is_active) VALUES ('Benchmark', 'Generated', true)"))
+    db.execute(text("""
+        INSERT INTO products (name, description, price, sku, stock_quantity, category_id, manufacturer, dosage, is_active)
+        SELECT
+            (ARRAY['Ibuprofen', 'Paracetamol', 'Amoxicillin', 'Vitamin D3', 'Metformin', 'Lisinopril', 'Omeprazole', 'Cetirizine'])[1 + i % 8]
+                || ' ' || (ARRAY['200mg', '500mg', '10mg', '1000IU'])[1 + i % 4] || ' #' || i,
+            'Generated product ' || i || ' for search benchmarking, tablets and capsules',
+            (i % 10000) / 100.0 + 1,
+            'SKU-' || lpad(i::text, 7, '0'),
+            i % 500,
+            1,
+            (ARRAY['PharmaCorp', 'MedTech', 'HealthPlus', 'CardioMed', 'Generic Pharma'])[1 + i % 5],
+            (ARRAY['200mg', '500mg', '10mg', '1000IU'])[1 + i % 4],
+            true
+        FROM generate_series(1, :rows) AS i
+    """), {"rows": rows})
+    db.commit()
+    db.execute(text("ANALYZE products"))
+
+def time_query(db, build):
+    """Return the median wall time in milliseconds of a query"""
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        build().limit(100).all()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+def _database_identity(url):
+    return (url.host or "localhost", url.port or 5432, url.database)
+
+def bench_engine():
+    """Engine for the scratch database; exits unless it is clearly not the application's"""
+    url = os.getenv("BENCH_DATABASE_URL")
+    if not url:
+        sys.exit("Set BENCH_DATABASE_URL to a scratch database; this benchmark truncates the catalog")
+    # Compared by server and database name, so a different driver or user does not slip through
+    target = make_url(url)
+    if _database_identity(target) == _database_identity(make_url(settings.DATABASE_URL)):
+        sys.exit("BENCH_DATABASE_URL is the application's DATABASE_URL; refusing to truncate it")
+    return create_engine(target)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark product search against a generated catalog")
+    parser.add_argument("rows", nargs="?", type=int, default=1_000_000)
+    parser.add_argument("--i-know-this-truncates", action="store_true", dest="confirmed",
+                        help="confirm that products, categories and everything referencing them will be emptied")
+    args = parser.parse_args()
+    if not args.confirmed:
+        parser.error("this benchmark truncates products and categories with CASCADE; pass --i-know-this-truncates")
+
+    engine = bench_engine()
+    Base.metadata.create_all(bind=engine)
+
+    db = sessionmaker(bind=engine)()
+    try:
+        generate_catalog(db, args.rows)
+        print(f"{'term':<16}{'ilike ms':>12}{'search ms':>12}{'hits':>8}")
+        for term in TERMS:
+            legacy = time_query(db, lambda: db.query(Product).filter(Product.name.ilike(f"%{term}%")))
+            ranked = time_query(db, lambda: search_products(db.query(Product), term))
+            hits = len(search_products(db.query(Product), term).limit(100).all())
+            print(f"{term:<16}{legacy:>12.2f}{ranked:>12.2f}{hits:>8}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
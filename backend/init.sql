@@ -3,6 +3,7 @@
 
 -- Create extensions if needed
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
 -- Insert sample categories
 INSERT INTO categories (name, description, is_active) VALUES
@@ -0,0 +1,111 @@
+"""
+Shared fixtures - tests run against a dedicated Postgres database named by TEST_DATABASE_URL
+
+Usage: TEST_DATABASE_URL=postgresql://.../opulon_test python -m pytest
+
+Every test starts from empty catalog, order and user tables, so never point
+TEST_DATABASE_URL at a database whose data matters.
+"""
+import os
+from contextlib import contextmanager
+from decimal import Decimal
+import pytest
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+_APP_DATABASE_URL = os.getenv("DATABASE_URL")
+
+if TEST_DATABASE_URL:
+    # Before app.core.config is imported, so every engine (replica included) uses the test database
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+    os.environ["DATABASE_REPLICA_URL"] = TEST_DATABASE_URL
+
+from sqlalchemy import event, text
+from app import models  # noqa: F401 - registers every table and mapper
+from app.core.database import Base, SessionLocal, engine as app_engine
+from app.core.cache import catalog_cache
+from app.models.product import Category, Product
+from app.models.product_image import ProductImage
+from app.models.user import User
+
+def pytest_collection_modifyitems(config, items):
+    if not TEST_DATABASE_URL:
+        reason = "TEST_DATABASE_URL is not set"
+    elif TEST_DATABASE_URL == _APP_DATABASE_URL:
+        reason = "TEST_DATABASE_URL is the application's DATABASE_URL; tests truncate tables"
+    else:
+        return
+    for item in items:
+        item.add_marker(pytest.mark.skip(reason=reason))
+
+@pytest.fixture(scope="session")
+def engine():
+    with app_engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    Base.metadata.create_all(bind=app_engine)
+    return app_engine
+
+@pytest.fixture
+def db(engine):
+    with engine.begin() as conn:
+        conn.execute(text("TRUNCATE products, categories, product_images, orders, order_items, users RESTART IDENTITY CASCADE"))
+    catalog_cache.clear()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def count_statements(engine):
+    """Context manager collecting every SQL statement sent while it is open"""
+    @contextmanager
+    def counter():
+        statements = []
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return counter
+
+@pytest.fixture
+def make_products(db):
+    """Create a category holding count products, each with images_each images"""
+    def factory(count: int, images_each: int = 0, stock: int = 100) -> Category:
+        category = Category(name=f"Category {db.query(Category).count() + 1}")
+        db.add(category)
+        db.flush()
+        for i in range(count):
+            product = Product(
+                name=f"Product {i:03d}",
+                price=Decimal("10.00"),
+                sku=f"SKU-{category.id}-{i:03d}",
+                stock_quantity=stock,
+                category_id=category.id
+            )
+            product.images = [
+                ProductImage(image_url=f"/uploads/{i}-{j}.jpg", display_order=j, is_primary=j == 0)
+                for j in range(images_each)
+            ]
+            db.add(product)
+        db.commit()
+        return category
+    return factory
+
+@pytest.fixture
+def make_user(db):
+    def factory(email: str = "shopper@example.com") -> User:
+        user = User(
+            email=email,
+            username=email.split("@")[0],
+            full_name="Test Shopper",
+            hashed_password="not-a-real-hash",
+            is_active=True,
+            is_verified=True
+        )
+        db.add(user)
+        db.commit()
+        return user
+    return factory
@@ -0,0 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from fastapi import HTTPException
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+from app.api.v1.orders import create_order
+from app.core.cache import catalog_cache, read_catalog_version
+from app.core.principals import Principal
+from app.models.order import Order
+from app.models.product import Product
+from app.schemas.order import OrderCreate, OrderItemBase
+
+CHECKOUTS = 300
+STOCK = 40
+WORKERS = 50
+
+def test_concurrent_checkouts_never_oversell(db, engine, make_products, make_user):
+    category = make_products(1, stock=STOCK)
+    product = db.query(Product).filter(Product.category_id == category.id).one()
+    shopper = Principal.from_user(make_user())
+    order = OrderCreate(
+        shipping_address="1 Test Street",
+        payment_method="card",
+        items=[OrderItemBase(product_id=product.id, quantity=1, price=product.price)]
+    )
+
+    # One connection per thread, so every checkout really runs in parallel
+    checkout_engine = create_engine(engine.url, pool_size=WORKERS, max_overflow=0)
+    CheckoutSession = sessionmaker(bind=checkout_engine, autoflush=False)
+
+    def checkout(_) -> int:
+        session = CheckoutSession()
+        try:
+            create_order(order, current_user=shopper, idempotency_key=None, db=session)
+            return 200
+        except HTTPException as e:
+            return e.status_code
+        finally:
+            session.close()
+
+    try:
+        with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+            statuses = list(pool.map(checkout, range(CHECKOUTS)))
+    finally:
+        checkout_engine.dispose()
+
+    assert statuses.count(200) == STOCK
+    assert set(statuses) <= {200, 400, 409}
+
+    db.expire_all()
+    assert db.get(Product, product.id).stock_quantity == 0
+    assert db.query(func.count(Order.id)).scalar() == STOCK
+    assert db.query(func.coalesce(func.sum(Order.total_amount), 0)).scalar() == product.price * STOCK
+
+def test_checkout_only_drops_the_ordered_products_detail_entries(db, make_products, make_user):
+    category = make_products(2, stock=STOCK)
+    ordered, other = db.query(Product).filter(Product.category_id == category.id).order_by(Product.id).all()
+    shopper = Principal.from_user(make_user())
+    order = OrderCreate(
+        shipping_address="1 Test Street",
+        payment_method="card",
+        items=[OrderItemBase(product_id=ordered.id, quantity=1, price=ordered.price)]
+    )
+
+    version = read_catalog_version()
+    catalog_cache.set(("products", version, 0, 100, None, None, None), "listing")
+    catalog_cache.set(("product", ordered.id, version), "ordered")
+    catalog_cache.set(("product", other.id, version), "other")
+
+    create_order(order, current_user=shopper, idempotency_key=None, db=db)
+
+    # Stock changes take no new catalog version and leave listings cached
+    assert read_catalog_version() == version
+    assert catalog_cache.get(("products", version, 0, 100, None, None, None)) == "listing"
+    assert catalog_cache.get(("product", ordered.id, version)) is None
+    assert catalog_cache.get(("product", other.id, version)) == "other"
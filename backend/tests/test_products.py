@@ -0,0 +1,28 @@
+from fastapi import Response
+from starlette.requests import Request
+from app.api.v1.products import get_products
+from app.core.cache import catalog_cache
+
+def _list_products(db, category_id: int, limit: int):
+    catalog_cache.clear()
+    request = Request({"type": "http", "method": "GET", "path": "/api/v1/products/", "headers": [], "query_string": b""})
+    return get_products(
+        request, Response(), skip=0, limit=limit, cursor=None, category_id=category_id, search=None, db=db
+    )
+
+def test_product_list_query_count_does_not_grow_with_page_size(db, make_products, count_statements):
+    category = make_products(100, images_each=2)
+
+    with count_statements() as one_product:
+        page = _list_products(db, category.id, limit=1)
+    assert len(page) == 1
+    assert len(page[0]["images"]) == 2
+
+    with count_statements() as hundred_products:
+        page = _list_products(db, category.id, limit=100)
+    assert len(page) == 100
+    assert all(len(product["images"]) == 2 for product in page)
+
+    assert len(hundred_products) == len(one_product)
+    # Images for the whole page come from one batched query
+    assert sum("product_images" in statement for statement in hundred_products) == 1
@@ -5,6 +5,7 @@ const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
 class ApiClient {
   private client: AxiosInstance;
+  private refreshing: Promise<string | null> | null = null;
 
   constructor() {
     this.client = axios.create({
@@ -31,7 +32,17 @@ class ApiClient {
     // Response interceptor for error handling
     this.client.interceptors.response.use(
       (response) => response,
-      (error) => {
+      async (error) => {
+        const original = error.config;
+        // Access tokens are short-lived; swap the refresh token for a new pair once, then retry
+        if (error.response?.status === 401 && original && !original._retried && !original.url?.startsWith('/auth/')) {
+          original._retried = true;
+          const token = await this.refreshTokens();
+          if (token) {
+            original.headers.Authorization = `Bearer ${token}`;
+            return this.client(original);
+          }
+        }
         if (error.response?.status === 401) {
           this.clearToken();
           if (typeof window !== 'undefined') {
@@ -53,16 +64,41 @@ class ApiClient {
   private clearToken(): void {
     if (typeof window !== 'undefined') {
       localStorage.removeItem('access_token');
+      localStorage.removeItem('refresh_token');
       localStorage.removeItem('user');
     }
   }
 
+  private refreshTokens(): Promise<string | null> {
+    // Concurrent 401s share one refresh; a refresh token is only accepted once
+    if (!this.refreshing) {
+      this.refreshing = (async () => {
+        const refreshToken = typeof window !== 'undefined' ? localStorage.getItem('refresh_token') : null;
+        if (!refreshToken) {
+          return null;
+        }
+        try {
+          const response = await this.client.post('/auth/refresh', { refresh_token: refreshToken });
+          localStorage.setItem('access_token', response.data.access_token);
+          localStorage.setItem('refresh_token', response.data.refresh_token);
+          return response.data.access_token as string;
+        } catch {
+          return null;
+        }
+      })().finally(() => {
+        this.refreshing = null;
+      });
+    }
+    return this.refreshing;
+  }
+
   // Auth endpoints
   async login(email: string, password: string) {
     try {
       const response = await this.client.post('/auth/login', { email, password });
       if (response.data.access_token) {
         localStorage.setItem('access_token', response.data.access_token);
+        localStorage.setItem('refresh_token', response.data.refresh_token);
         if (response.data.user) {
           localStorage.setItem('user', JSON.stringify(response.data.user));
         }
@@ -126,7 +162,8 @@ class ApiClient {
 
   async logout() {
     try {
-      await this.client.post('/auth/logout');
+      const refreshToken = localStorage.getItem('refresh_token');
+      await this.client.post('/auth/logout', refreshToken ? { refresh_token: refreshToken } : {});
     } catch (error) {
       // Continue with logout even if API call fails
     } finally {